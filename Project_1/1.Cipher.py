@@ -52,15 +52,19 @@ Example:
 The same method can be used for both encryption and decryption, allowing for secure communication using a shared key.
 """
 
-# The encrypted text we want to decode
-text = 'mrttaqrhknsw ih puggrur'
-
-# The key used for encryption and decryption
-custom_key = 'happycoding'
+import argparse  # Parses the command-line options of the streaming encrypt/decrypt tool
+import re  # Used to locate the runs of letters that have to be written back between the punctuation
+import os  # Used to find out how many CPU cores are available for parallel processing
+import sys  # Gives access to stdin/stdout for the command-line tool
+from collections import Counter, deque  # Counter tallies letters for cryptanalysis; deque orders parallel chunks
+from concurrent.futures import ProcessPoolExecutor  # Runs chunks of a large input on several CPU cores
+from functools import lru_cache  # Caches the shift tables built for each key so repeated calls reuse them
+from itertools import compress, repeat  # Feed constants and selected distances to the C-level loops of cryptanalysis
+from operator import add, mul  # Combine letter counts, frequencies and trigram codes element-wise inside map()
 
 # Function that performs the Vigenère cipher, capable of both encryption and decryption
-def vigenere(message, key, direction=1):  # 'direction=1' means encryption; 'direction=-1' means decryption
-    key_index = 0  # To track which character in the key we are using
+# 'key_index' is the position in the key to start from (0 unless continuing a previous piece of text)
+def vigenere(message, key, direction=1, key_index=0):  # 'direction=1' means encryption; 'direction=-1' means decryption
     alphabet = 'abcdefghijklmnopqrstuvwxyz'  # The alphabet used for shifting letters
     final_message = ''  # This will store the encrypted or decrypted result
 
@@ -92,20 +96,355 @@ def vigenere(message, key, direction=1):  # 'direction=1' means encryption; 'dir
     # Return the full encrypted or decrypted message
     return final_message
 
+# Every byte that is not a lowercase ASCII letter; these are deleted to collect the letters into one buffer
+_NON_LETTER_BYTES = bytes(byte for byte in range(256) if not 97 <= byte <= 122)
+
+# Matches a run of consecutive lowercase ASCII letters in the encoded message
+_LETTER_RUN = re.compile(rb'[a-z]+')
+
+# Builds a 256-byte table for bytes.translate() that shifts every lowercase letter by 'shift' places
+# and leaves every other byte untouched
+def _shift_table(shift):
+    alphabet = b'abcdefghijklmnopqrstuvwxyz'
+    table = bytearray(range(256))  # Start from the identity mapping
+    for index, letter in enumerate(alphabet):
+        table[letter] = alphabet[(index + shift) % len(alphabet)]
+    return bytes(table)
+
+# One precomputed table per possible shift (0-25), shared by every key
+_SHIFT_TABLES = tuple(_shift_table(shift) for shift in range(26))
+
+# Returns the translation tables for each position of the key, cached so a key is only analysed once.
+# Returns None if the key has characters outside a-z: vigenere() only fails on such a character when a letter
+# actually uses it, so those keys are left to vigenere() itself
+@lru_cache(maxsize=128)
+def _key_tables(key, direction):
+    alphabet = 'abcdefghijklmnopqrstuvwxyz'
+    if not all(key_char in alphabet for key_char in key):
+        return None
+    return tuple(_SHIFT_TABLES[(alphabet.index(key_char) * direction) % 26] for key_char in key)
+
+# Matches a run of non-ASCII characters in the lowercased message
+_NON_ASCII_RUN = re.compile(r'[^\x00-\x7f]+')
+
+# vigenere() shifts a non-ASCII letter (like 'é') from alphabet.find(char) == -1, which gives the same letter
+# as shifting 'z' (-1 and 25 are equal modulo 26); replacing them by 'z' lets the byte tables handle them
+def _replace_non_ascii_letters(match):
+    return ''.join('z' if char.isalpha() else char for char in match.group())
+
+# Shifts one piece of text starting at position 'key_index' of the key and returns the result together
+# with the number of letters it consumed, so that the next piece can carry on from the right key position
+def _vigenere_chunk(message, key, direction, key_index):
+    tables = _key_tables(key, direction)
+    if tables is None:
+        return vigenere(message, key, direction, key_index), _letter_count(message)
+
+    lowered = message.lower()
+    if not lowered.isascii():
+        lowered = _NON_ASCII_RUN.sub(_replace_non_ascii_letters, lowered)
+
+    # In UTF-8 every byte of a multi-byte character is >= 0x80, so only real a-z letters are shifted
+    buffer = lowered.encode('utf-8')
+
+    # Collect all letters into one contiguous buffer (punctuation and spaces don't consume key characters)
+    letters = bytearray(buffer.translate(None, _NON_LETTER_BYTES))
+    if not letters:
+        return lowered, 0
+
+    # Letter number i is shifted by key[(key_index + i) % len(key)], so every i-th letter (a "column")
+    # shares one table; rotating the tables makes column 0 start at the requested key position
+    period = len(tables)
+    start = key_index % period
+    tables = tables[start:] + tables[:start]
+    for column, table in enumerate(tables):
+        letters[column::period] = letters[column::period].translate(table)
+
+    # Nothing but letters: no need to merge the punctuation back in
+    if len(letters) == len(buffer):
+        return letters.decode('ascii'), len(letters)
+
+    # Copy the shifted letters back over the original letter runs, leaving everything else in place
+    output = bytearray(buffer)
+    shifted = memoryview(letters)
+    position = 0
+    for match in _LETTER_RUN.finditer(buffer):
+        start, end = match.span()
+        output[start:end] = shifted[position:position + end - start]
+        position += end - start
+
+    return output.decode('utf-8'), len(letters)
+
+# Table-driven version of vigenere() that produces exactly the same output but processes the whole
+# message in bulk instead of character by character, which makes it suitable for multi-megabyte inputs
+def vigenere_table(message, key, direction=1, key_index=0):
+    return _vigenere_chunk(message, key, direction, key_index)[0]
+
+# Encrypts or decrypts an iterable of text chunks (for example the lines of a file) lazily, one chunk at a
+# time; the key position is carried over from one chunk to the next, so the joined output is the same as
+# processing the whole text at once while only one chunk is ever held in memory
+def vigenere_stream(chunks, key, direction=1):
+    key_index = 0
+    for chunk in chunks:
+        result, letter_count = _vigenere_chunk(chunk, key, direction, key_index)
+        key_index += letter_count  # Letters seen so far decide where in the key the next chunk starts
+        yield result
+
+# Counts the characters of a chunk that consume a key character (the letters, as vigenere() sees them)
+def _letter_count(message):
+    lowered = message.lower()
+    if lowered.isascii():
+        return len(lowered.encode('ascii').translate(None, _NON_LETTER_BYTES))
+    return sum(map(str.isalpha, lowered))
+
+# Parallel version of vigenere_stream(): the key position of a chunk depends only on how many letters came
+# before it, so the letters are counted (a cheap pass) and prefix-summed in this process while the actual
+# shifting runs on 'workers' processes (all CPU cores by default). At most two chunks per worker are in
+# flight at any time, which keeps memory bounded, and results are yielded in the original order
+def vigenere_parallel(chunks, key, direction=1, workers=None):
+    workers = workers or os.cpu_count() or 1
+    pending = deque()  # Futures of the chunks submitted so far, oldest first
+    key_index = 0
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for chunk in chunks:
+            pending.append(pool.submit(vigenere_table, chunk, key, direction, key_index))
+            key_index += _letter_count(chunk)  # Running prefix sum = starting key position of the next chunk
+            if len(pending) >= 2 * workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+# Reads 'source' in chunks of 'chunk_size' characters and writes the encrypted/decrypted text to
+# 'destination' (both are text file objects), so files of any size are processed in constant memory.
+# With 'workers' greater than 1 (or None for all cores) the chunks are processed by vigenere_parallel()
+def vigenere_file(source, destination, key, direction=1, chunk_size=1 << 20, workers=1):
+    chunks = iter(lambda: source.read(chunk_size), '')  # Calls source.read() until it returns ''
+    if workers == 1:
+        results = vigenere_stream(chunks, key, direction)
+    else:
+        results = vigenere_parallel(chunks, key, direction, workers)
+    for result in results:
+        destination.write(result)
+
 # Function to encrypt a message using the Vigenère cipher
 def encrypt(message, key):
-    return vigenere(message, key)
+    return vigenere_table(message, key)
 
 # Function to decrypt a message using the Vigenère cipher
 def decrypt(message, key):
-    return vigenere(message, key, -1)  # 'direction=-1' means we are decrypting (reverse shift)
+    return vigenere_table(message, key, -1)  # 'direction=-1' means we are decrypting (reverse shift)
+
+# ---------------------------------------------------------------------------------------------------------
+# Cryptanalysis: recovering the key of a ciphertext without knowing it
+#
+# 1. **Key length**: letters that were shifted by the same key character (a "column") keep the uneven letter
+#    distribution of English, so their index of coincidence is high (~0.066) while text shifted by a mix of
+#    key characters looks random (~0.038). Repeated trigrams (Kasiski examination) add evidence: the distance
+#    between two repeats is usually a multiple of the key length.
+# 2. **Key characters**: each column is a plain Caesar cipher, so the shift whose letter frequencies are
+#    closest to English (lowest chi-squared statistic) gives the key character of that column.
+# 3. **Verification**: every candidate key is checked by decrypting the text with decrypt() and scoring it.
+#
+# Letter frequencies are counted with bytes.count(), one C-level pass per letter, instead of Python loops.
+# Short ciphertexts (like 'mrttaqrhknsw ih puggrur') simply don't contain enough letters per column for any
+# statistical attack to work, so crack() only gives meaningful results for longer texts, and raises
+# ValueError when there are not even MIN_CRACK_LETTERS letters.
+# ---------------------------------------------------------------------------------------------------------
+
+# The index of coincidence of a column needs at least two letters, so fewer letters give no statistic at all
+MIN_CRACK_LETTERS = 2
+
+# Relative frequency of each letter a-z in English text
+ENGLISH_FREQUENCIES = (
+    0.08167, 0.01492, 0.02782, 0.04253, 0.12702, 0.02228, 0.02015, 0.06094, 0.06966,
+    0.00153, 0.00772, 0.04025, 0.02406, 0.06749, 0.07507, 0.01929, 0.00095, 0.05987,
+    0.06327, 0.09056, 0.02758, 0.00978, 0.02360, 0.00150, 0.01974, 0.00074,
+)
+
+# Returns only the letters of a text as lowercase ASCII bytes (spaces and punctuation removed)
+def _letters_only(text):
+    return text.lower().encode('ascii', 'ignore').translate(None, _NON_LETTER_BYTES)
+
+# Counts how often each letter a-z occurs in a bytes object of letters
+def letter_counts(letters):
+    return [letters.count(letter) for letter in b'abcdefghijklmnopqrstuvwxyz']
+
+# Probability that two letters picked at random from the text are the same letter
+def index_of_coincidence(counts):
+    total = sum(counts)
+    if total < 2:
+        return 0.0
+    # sum(count * (count - 1)) == sum(count * count) - total
+    return (sum(map(mul, counts, counts)) - total) / (total * (total - 1))
+
+# 1 / frequency of each letter, precomputed for chi_squared()
+_INVERSE_FREQUENCIES = tuple(1 / frequency for frequency in ENGLISH_FREQUENCIES)
+
+# Chi-squared distance between letter counts and English; the lower, the more English-like the text.
+# sum((c - N*e)**2 / (N*e)) expands to sum(c*c / e) / N - 2*N + N*sum(e), which map() evaluates in C
+def chi_squared(counts):
+    total = sum(counts)
+    if total == 0:
+        return float('inf')
+    weighted_squares = sum(map(mul, map(mul, counts, counts), _INVERSE_FREQUENCIES))
+    return weighted_squares / total - 2 * total + total * sum(ENGLISH_FREQUENCIES)
+
+# Kasiski examination: counts how often each possible key length divides the distance between repeated
+# trigrams; the real key length (and its divisors) collects the most votes.
+# Every trigram is turned into one number (map() does that in C), and the positions are sorted by trigram
+# (sorted() is stable, so the occurrences of a trigram stay in position order): repeated trigrams end up next
+# to each other, and the distances are those between neighbouring positions
+def kasiski_key_lengths(letters, max_key_length=20):
+    trigrams = list(map(add, map(mul, letters, repeat(1 << 16)), map(add, map(mul, letters[1:], repeat(1 << 8)),
+                                                                      letters[2:])))
+    positions = sorted(range(len(trigrams)), key=trigrams.__getitem__)
+    distances = Counter(position - previous for previous, position in zip(positions, positions[1:])
+                        if trigrams[previous] == trigrams[position])
+    votes = Counter()
+    for key_length in range(2, max_key_length + 1):
+        votes[key_length] = sum(count for distance, count in distances.items() if distance % key_length == 0)
+    return votes
+
+# Up to this many letters, _column_coincidences() compares the text with shifted copies of itself
+_AUTOCORRELATION_LIMIT = 4096
+
+# Counts, for every key length up to 'max_key_length', the (ordered) pairs of equal letters that fall in the
+# same column, i.e. whose distance is a multiple of the key length
+def _column_coincidences(letters, max_key_length):
+    length = len(letters)
+    counts = letter_counts(letters)
+    equal_pairs = {1: sum(map(mul, counts, counts)) - length}  # A single column: the whole text
+    if length > _AUTOCORRELATION_LIMIT:
+        # Long texts: count the letters of every column (the cost grows with length * max_key_length)
+        for key_length in range(2, max_key_length + 1):
+            equal_pairs[key_length] = 0
+            for column in range(key_length):
+                counts = Counter(letters[column::key_length]).values()
+                equal_pairs[key_length] += sum(map(mul, counts, counts)) - sum(counts)
+        return equal_pairs
+
+    # Short texts (the usual case when cracking): matches[d] is the number of positions where the text and
+    # the text shifted by d letters have the same letter. XOR-ing the two as big integers turns equal letters
+    # into zero bytes, which bytes.count() counts in C, so each distance costs a few C calls. Distances that
+    # no key length from 2 up divides (primes above max_key_length, for instance) are skipped
+    wanted = bytearray(length)
+    for key_length in range(2, max_key_length + 1):
+        wanted[key_length::key_length] = bytes([1]) * len(range(key_length, length, key_length))
+    as_number = int.from_bytes(letters, 'big')
+    matches = [0] * length
+    for distance in compress(range(length), wanted):
+        difference = int.from_bytes(letters[distance:], 'big') ^ (as_number >> (8 * distance))
+        matches[distance] = difference.to_bytes(length - distance, 'big').count(0)
+    for key_length in range(2, max_key_length + 1):
+        equal_pairs[key_length] = 2 * sum(matches[key_length::key_length])
+    return equal_pairs
+
+# Ranks the possible key lengths from most to least likely, using the average index of coincidence of the
+# columns plus a small bonus for lengths supported by the Kasiski examination
+def estimate_key_lengths(ciphertext, max_key_length=20):
+    letters = _letters_only(ciphertext)
+    max_key_length = max(1, min(max_key_length, len(letters) // 2))
+    votes = kasiski_key_lengths(letters, max_key_length)
+    total_votes = sum(votes.values()) or 1
+
+    equal_pairs = _column_coincidences(letters, max_key_length)
+    scores = {}
+    length = len(letters)
+    for key_length in range(1, max_key_length + 1):
+        # Index of coincidence of the columns together: the pairs of equal letters within a column divided by
+        # all the pairs within a column ('longer_columns' of the columns have rows + 1 letters)
+        rows, longer_columns = divmod(length, key_length)
+        pairs = longer_columns * (rows + 1) * rows + (key_length - longer_columns) * rows * (rows - 1)
+        ioc = equal_pairs[key_length] / pairs if pairs else 0.0
+        scores[key_length] = ioc + 0.01 * votes[key_length] / total_votes
+
+    # Multiples of the real key length score just as well (their columns are English too), so every length
+    # within 10% of the best score (or simply English-like, above 0.06) is ranked first, shortest first,
+    # followed by the rest from best to worst
+    threshold = min(0.9 * max(scores.values()), 0.06)
+    return sorted(scores, key=lambda key_length: (scores[key_length] < threshold,
+                                                  key_length if scores[key_length] >= threshold else -scores[key_length]))
+
+# Finds the most likely key of a given length: every column is solved as a Caesar cipher by trying all 26
+# shifts and keeping the one that makes the column's letter frequencies closest to English
+def recover_key(ciphertext, key_length):
+    alphabet = 'abcdefghijklmnopqrstuvwxyz'
+    letters = _letters_only(ciphertext)
+    key = ''
+    for column in range(key_length):
+        counts = letter_counts(letters[column::key_length])
+        # Decrypting with shift s turns the ciphertext letter (i + s) into plaintext letter i. Only the
+        # sum(c*c / e) term of chi_squared() depends on the shift, so that is all that is compared
+        squares = list(map(mul, counts, counts)) * 2  # Twice, so that every rotation is one slice
+        best_shift = min(range(26), key=lambda shift: sum(map(mul, squares[shift:shift + 26], _INVERSE_FREQUENCIES)))
+        key += alphabet[best_shift]
+    return _shortest_period(key)
+
+# Reduces a key that repeats itself (like 'lemonlemon') to its shortest period ('lemon')
+def _shortest_period(key):
+    for period in range(1, len(key)):
+        if len(key) % period == 0 and key == key[:period] * (len(key) // period):
+            return key[:period]
+    return key
+
+# Breaks a Vigenère ciphertext without the key: the 'candidates' most likely key lengths are solved and each
+# recovered key is verified by decrypting the text with decrypt(); returns the best (key, plaintext) pair.
+# Multiples of a length that was already tried are skipped: a longer key fits each of its (smaller) columns
+# more closely and would always "win" the verification without being the real key.
+# Raises ValueError if the ciphertext has fewer than MIN_CRACK_LETTERS letters
+def crack(ciphertext, max_key_length=20, candidates=3):
+    letter_count = len(_letters_only(ciphertext))
+    if letter_count < MIN_CRACK_LETTERS:
+        raise ValueError(f'Cannot crack a text with fewer than {MIN_CRACK_LETTERS} letters (found {letter_count})')
+    best = None
+    tried_lengths = []
+    for key_length in estimate_key_lengths(ciphertext, max_key_length)[:candidates]:
+        if any(key_length % tried == 0 for tried in tried_lengths):
+            continue
+        tried_lengths.append(key_length)
+        key = recover_key(ciphertext, key_length)
+        plaintext = decrypt(ciphertext, key)
+        score = chi_squared(letter_counts(_letters_only(plaintext)))
+        if best is None or score < best[0]:
+            best = (score, key, plaintext)
+    return best[1], best[2]
+
+# Command-line entry point: encrypts or decrypts a file (or stdin) and writes the result to a file (or stdout)
+# Example: echo 'mrttaqrhknsw ih puggrur' | python 1.Cipher.py decrypt --key happycoding
+# The 'crack' mode reads the whole input, prints the recovered key to stderr and writes the decrypted text
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Encrypt or decrypt text with the Vigenère cipher.')
+    parser.add_argument('mode', choices=['encrypt', 'decrypt', 'crack'],
+                        help='whether to encrypt, decrypt or crack (decrypt without the key) the input')
+    parser.add_argument('--key', help='the cipher key (lowercase letters a-z), not used by crack')
+    parser.add_argument('input', nargs='?', default='-', help="file to read, or '-' for stdin (default)")
+    parser.add_argument('-o', '--output', default='-', help="file to write, or '-' for stdout (default)")
+    parser.add_argument('--chunk-size', type=int, default=1 << 20, help='characters read per chunk')
+    parser.add_argument('--workers', type=int, default=1, help='processes to use; 0 means all CPU cores')
+    args = parser.parse_intermixed_args(argv)  # Allows options between the positional arguments
+    if args.mode != 'crack' and not args.key:
+        parser.error(f'--key is required to {args.mode}')
 
-# Print the original encrypted text
-print(f'\nEncrypted text: {text}')
+    direction = 1 if args.mode == 'encrypt' else -1  # Same convention as vigenere()
 
-# Print the key used for encryption/decryption
-print(f'Key: {custom_key}')
+    # newline='' keeps line endings exactly as they are in the input file
+    source = sys.stdin if args.input == '-' else open(args.input, encoding='utf-8', newline='')
+    destination = sys.stdout if args.output == '-' else open(args.output, 'w', encoding='utf-8', newline='')
+    try:
+        if args.mode == 'crack':
+            try:
+                key, plaintext = crack(source.read())
+            except ValueError as error:
+                sys.exit(f'Error: {error}')  # Exit status 1
+            print(f'Key: {key}', file=sys.stderr)
+            destination.write(plaintext)
+            return
+        vigenere_file(source, destination, args.key, direction, args.chunk_size, args.workers or None)
+    finally:
+        # Only close the files we opened ourselves, never stdin/stdout
+        if source is not sys.stdin:
+            source.close()
+        if destination is not sys.stdout:
+            destination.close()
 
-# Decrypt the text using the custom key and print the decrypted message
-decryption = decrypt(text, custom_key)
-print(f'\nDecrypted text: {decryption}\n')
\ No newline at end of file
+if __name__ == '__main__':
+    main()
\ No newline at end of file
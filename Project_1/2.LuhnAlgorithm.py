@@ -32,6 +32,18 @@ In conclusion, if the final sum is divisible by 10, the card number is considere
 algorithm. This method helps in preventing accidental errors in credit card numbers.
 """
 
+import csv  # Splits the delimited lines that have quoted fields
+from operator import mul  # Multiplies digits by their weights inside map() for the ISBN-10 check
+
+
+# Digit-weight table shared by all the Luhn functions below: the value a digit contributes to the Luhn sum when it sits
+# in a doubled position, indexed by the digit. The digit is doubled and, if the result is 10 or more, its two
+# digits are added together (e.g. 7 -> 14 -> 1 + 4 = 5): 0, 2, 4, 6, 8, 1, 3, 5, 7, 9
+DOUBLED_DIGIT_VALUES = tuple(sum(divmod(digit * 2, 10)) for digit in range(10))
+
+# The same table as a bytes.translate() table working on ASCII digits ('7' -> '5')
+DOUBLED_DIGITS = bytes.maketrans(b'0123456789', bytes(ord('0') + value for value in DOUBLED_DIGIT_VALUES))
+
 
 def verify_card_number(card_number):
     sum_of_odd_digits = 0  # This will store the sum of all digits in the odd positions (from the right)
@@ -53,13 +65,9 @@ def verify_card_number(card_number):
     
     # Loop through each even-positioned digit
     for digit in even_digits:
-        number = int(digit) * 2  # Double the digit
-        
-        # If doubling the digit gives a result >= 10, sum the individual digits (e.g., 12 becomes 1 + 2)
-        if number >= 10:
-            number = (number // 10) + (number % 10)  # Split the number into its tens and units digits, then add them together
-            
-        sum_of_even_digits += number  # Add the result to the sum_of_even_digits
+        # Look up the doubled digit in the shared table (doubling it and, for results >= 10, summing the
+        # individual digits, e.g. 6 -> 12 -> 1 + 2) and add the result to the sum_of_even_digits
+        sum_of_even_digits += DOUBLED_DIGIT_VALUES[int(digit)]
 
     # Calculate the total sum by adding both odd and even digit sums
     total = sum_of_odd_digits + sum_of_even_digits
@@ -68,21 +76,363 @@ def verify_card_number(card_number):
     return total % 10 == 0
 
 
-def main():
-    card_number = '4111-1111-4555-1241'  # Example card number to be verified
-    
-    # Create a translation table to remove hyphens and spaces from the card number
-    card_translation = str.maketrans({'-': '', ' ': ''})
-    
-    # Translate the card number (removing any hyphens or spaces) using the translation table
-    translated_card_number = card_number.translate(card_translation)
+# ---------------------------------------------------------------------------------------------------------
+# Batch validation: checks many card numbers at once using a precomputed lookup table for the doubled digits
+#
+# Instead of converting every digit with int() and doubling it in Python, the digits are kept as ASCII bytes:
+# - bytes.translate() replaces every doubled-position digit with its "doubled and adjusted" value in one
+#   C-level pass ('5' -> 10 -> 1 + 0 -> '1'), using the DOUBLED_DIGITS table
+# - sum() over a bytes object adds up the byte values, so subtracting 48 (ord('0')) per digit gives the sum
+#   of the digits without creating a single string per digit
+# ---------------------------------------------------------------------------------------------------------
+
+
+# Luhn check for a card number given as ASCII digit bytes
+def _luhn_valid(number):
+    reversed_number = number[::-1]  # Positions are counted from the right, like in verify_card_number()
+    total = sum(reversed_number[::2]) + sum(reversed_number[1::2].translate(DOUBLED_DIGITS))
+    return (total - 48 * len(number)) % 10 == 0  # Remove ord('0') from every digit before checking
+
+
+# Validates a whole batch of card numbers (an iterable of str or bytes, already stripped of separators)
+# and returns a list of booleans, one per number, in the same order. Unlike verify_card_number(), which
+# raises ValueError on a non-digit character, numbers that are empty or not made of digits are simply False
+def verify_card_numbers(card_numbers):
+    mask = []
+    for number in card_numbers:
+        if isinstance(number, str):
+            number = number.encode()  # Non-ASCII digits become multi-byte sequences and fail isdigit() below
+        mask.append(number.isdigit() and _luhn_valid(number))
+    return mask
+
+
+# Validates a newline-delimited file of card numbers (one per line) and returns the list of booleans
+def verify_card_file(path):
+    with open(path, 'rb') as card_file:
+        return verify_card_numbers(line.strip() for line in card_file)
+
+
+# ---------------------------------------------------------------------------------------------------------
+# Check digits and test numbers
+#
+# The check digit is the last digit of a card number, chosen so that the whole number passes the Luhn check.
+# While it is missing, the rightmost digit of the partial number is the one that will end up in a doubled
+# position, so the doubled and plain positions are swapped compared to _luhn_valid().
+# ---------------------------------------------------------------------------------------------------------
+
+
+# Returns the check digit (as a one-character string) that makes partial_number + check digit valid
+def luhn_check_digit(partial_number):
+    if isinstance(partial_number, str):
+        partial_number = partial_number.encode()
+    if not partial_number.isdigit():
+        raise ValueError('Card number must only contain digits')
+
+    reversed_number = partial_number[::-1]
+    total = sum(reversed_number[::2].translate(DOUBLED_DIGITS)) + sum(reversed_number[1::2])
+    total -= 48 * len(partial_number)  # Remove ord('0') from every digit
+    return str((10 - total % 10) % 10)
+
+
+# Yields 'count' random card numbers that pass the Luhn check, each starting with the issuer prefix (IIN)
+# 'prefix' and 'length' digits long. Meant for load testing, so the fast (not cryptographically secure)
+# 'random' module is used; pass 'seed' to get the same numbers on every run
+def generate_card_numbers(prefix, length=16, count=1, seed=None):
+    import random  # Only needed when generating numbers
+
+    if not prefix.isdigit():
+        raise ValueError('Prefix must only contain digits')
+    body_length = length - len(prefix) - 1  # Random digits between the prefix and the check digit
+    if body_length < 0:
+        raise ValueError(f'A {length}-digit card number cannot start with the {len(prefix)}-digit prefix {prefix}')
+
+    generator = random.Random(seed)
+    for _ in range(count):
+        body = f'{generator.randrange(10 ** body_length):0{body_length}d}' if body_length else ''  # ':00d' gives '0'
+        partial_number = prefix + body
+        yield partial_number + luhn_check_digit(partial_number)
+
+
+# ---------------------------------------------------------------------------------------------------------
+# Checksum registry: the same kind of table-driven check for other identifiers found next to card numbers
+#
+# Every validator takes the identifier as ASCII bytes with separators already removed and returns True/False
+# (also False for a malformed identifier). CHECKSUMS maps a scheme name to its validator, so a stream of mixed
+# records can be dispatched with one dictionary lookup per record; add an entry to support another scheme.
+# ---------------------------------------------------------------------------------------------------------
+
+# Separators allowed inside a card number ('4111-1111-4555-1241', '4111 1111 4555 1241') or other identifier;
+# for bytes, translate(None, SEPARATORS) deletes them the same way the str.maketrans() table in main() does
+SEPARATORS = b'- '
+
+# Converts ASCII digits into their values ('7' -> 7) so that they can index the tables below directly
+DIGIT_VALUES = bytes.maketrans(b'0123456789', bytes(range(10)))
+
+# The same for ISBN-10, whose check digit 'X' stands for 10
+ISBN10_VALUES = bytes.maketrans(b'0123456789X', bytes(range(11)))
+
+# Verhoeff: multiplication table of the dihedral group D5 and the position-dependent permutation table
+VERHOEFF_MULTIPLICATION = (
+    (0, 1, 2, 3, 4, 5, 6, 7, 8, 9), (1, 2, 3, 4, 0, 6, 7, 8, 9, 5), (2, 3, 4, 0, 1, 7, 8, 9, 5, 6),
+    (3, 4, 0, 1, 2, 8, 9, 5, 6, 7), (4, 0, 1, 2, 3, 9, 5, 6, 7, 8), (5, 9, 8, 7, 6, 0, 4, 3, 2, 1),
+    (6, 5, 9, 8, 7, 1, 0, 4, 3, 2), (7, 6, 5, 9, 8, 2, 1, 0, 4, 3), (8, 7, 6, 5, 9, 3, 2, 1, 0, 4),
+    (9, 8, 7, 6, 5, 4, 3, 2, 1, 0),
+)
+VERHOEFF_PERMUTATION = (
+    (0, 1, 2, 3, 4, 5, 6, 7, 8, 9), (1, 5, 7, 6, 2, 8, 3, 0, 9, 4), (5, 8, 0, 3, 7, 9, 6, 1, 4, 2),
+    (8, 9, 1, 6, 0, 4, 3, 5, 2, 7), (9, 4, 5, 3, 1, 2, 6, 8, 7, 0), (4, 2, 8, 6, 5, 7, 3, 9, 0, 1),
+    (2, 7, 9, 3, 8, 0, 6, 4, 1, 5), (7, 0, 4, 6, 9, 1, 3, 2, 5, 8),
+)
+
+# Damm: a totally anti-symmetric quasigroup of order 10
+DAMM_TABLE = (
+    (0, 3, 1, 7, 5, 9, 8, 6, 4, 2), (7, 0, 9, 2, 1, 5, 4, 8, 6, 3), (4, 2, 0, 6, 8, 7, 1, 3, 5, 9),
+    (1, 7, 5, 0, 9, 8, 3, 4, 2, 6), (6, 1, 2, 3, 0, 4, 5, 9, 7, 8), (3, 6, 7, 4, 2, 0, 9, 5, 8, 1),
+    (5, 8, 6, 9, 7, 2, 0, 1, 3, 4), (8, 9, 4, 5, 3, 6, 2, 0, 1, 7), (9, 4, 3, 8, 6, 1, 7, 2, 0, 5),
+    (2, 5, 8, 1, 4, 3, 6, 7, 9, 0),
+)
+
+# IBAN letters are replaced by two-digit numbers before the mod-97 check: A -> 10, B -> 11, ..., Z -> 35
+IBAN_LETTERS = str.maketrans({letter: str(value) for value, letter in enumerate('ABCDEFGHIJKLMNOPQRSTUVWXYZ', 10)})
+
+
+# Luhn check with the digits-only test that verify_card_numbers() does
+def _luhn_checksum(number):
+    return number.isdigit() and _luhn_valid(number)
+
+
+# IMEI: 15 digits, the last one being a Luhn check digit
+def _imei_checksum(number):
+    return len(number) == 15 and _luhn_checksum(number)
+
+
+# EAN-13: digits are weighted 1, 3, 1, 3, ... from the left and the total must be divisible by 10
+def _ean13_checksum(number):
+    if len(number) != 13 or not number.isdigit():
+        return False
+    values = number.translate(DIGIT_VALUES)
+    return (sum(values[::2]) + 3 * sum(values[1::2])) % 10 == 0
+
+
+# ISBN-13 is an EAN-13 in the "Bookland" ranges 978 and 979
+def _isbn13_checksum(number):
+    return number[:3] in (b'978', b'979') and _ean13_checksum(number)
+
+
+# ISBN-10: digits are weighted 10, 9, ..., 1 and the total must be divisible by 11; the check digit 'X' means 10
+def _isbn10_checksum(number):
+    number = number.upper()
+    if len(number) != 10 or not number[:9].isdigit() or not (number[9:].isdigit() or number[9:] == b'X'):
+        return False
+    values = number.translate(ISBN10_VALUES)
+    return sum(map(mul, values, range(10, 0, -1))) % 11 == 0
+
+
+# IBAN (ISO 13616, mod-97): the first four characters are moved to the end, letters become numbers and the
+# resulting integer must leave a remainder of 1 when divided by 97
+def _iban_checksum(number):
+    number = number.upper()
+    if not 15 <= len(number) <= 34 or not number.isalnum() or not number[:2].isalpha() or not number[2:4].isdigit():
+        return False
+    rearranged = (number[4:] + number[:4]).decode('ascii').translate(IBAN_LETTERS)
+    return int(rearranged) % 97 == 1
+
+
+# Verhoeff: the digits (from the right) are permuted by position and combined with the D5 group table
+def _verhoeff_checksum(number):
+    if not number.isdigit():
+        return False
+    check = 0
+    for position, digit in enumerate(number[::-1].translate(DIGIT_VALUES)):
+        check = VERHOEFF_MULTIPLICATION[check][VERHOEFF_PERMUTATION[position % 8][digit]]
+    return check == 0
+
+
+# Damm: the digits are fed through the quasigroup table and a valid number ends in the interim digit 0
+def _damm_checksum(number):
+    if not number.isdigit():
+        return False
+    interim = 0
+    for digit in number.translate(DIGIT_VALUES):
+        interim = DAMM_TABLE[interim][digit]
+    return interim == 0
+
+
+# Scheme name -> validator
+CHECKSUMS = {
+    'luhn': _luhn_checksum,
+    'imei': _imei_checksum,
+    'ean13': _ean13_checksum,
+    'isbn10': _isbn10_checksum,
+    'isbn13': _isbn13_checksum,
+    'iban': _iban_checksum,
+    'verhoeff': _verhoeff_checksum,
+    'damm': _damm_checksum,
+}
+
+
+# Looks up the validator of a scheme, with a clear error message for unknown schemes
+def _checksum_validator(scheme):
+    try:
+        return CHECKSUMS[scheme]
+    except KeyError:
+        raise ValueError(f"Unknown checksum scheme '{scheme}', expected one of: {', '.join(CHECKSUMS)}") from None
+
+
+# Turns a str/bytes identifier into ASCII bytes without separators or surrounding whitespace
+def _normalize_identifier(value):
+    if isinstance(value, str):
+        value = value.encode()  # Non-ASCII characters become multi-byte sequences that every validator rejects
+    return value.strip().translate(None, SEPARATORS)
+
+
+# Validates a batch of identifiers of one scheme and returns a list of booleans in the same order
+def verify_checksums(scheme, values):
+    validator = _checksum_validator(scheme)
+    return [validator(_normalize_identifier(value)) for value in values]
+
+
+# Validates a stream of mixed (scheme, value) records in a single pass and returns a list of booleans
+def verify_records(records):
+    validators = {}  # Validators already looked up in this pass
+    mask = []
+    for scheme, value in records:
+        validator = validators.get(scheme)
+        if validator is None:
+            validator = validators[scheme] = _checksum_validator(scheme)
+        mask.append(validator(_normalize_identifier(value)))
+    return mask
+
+
+# Compares the throughput of verify_card_number() and verify_card_numbers() on 'count' random 16-digit numbers
+def benchmark(count=1_000_000):
+    import random  # Only needed to create the test data
+    import time
+
+    card_numbers = [str(random.randrange(10**15, 10**16)) for _ in range(count)]
+
+    start = time.perf_counter()
+    scalar_mask = [verify_card_number(number) for number in card_numbers]
+    scalar_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    batch_mask = verify_card_numbers(card_numbers)
+    batch_time = time.perf_counter() - start
+
+    assert scalar_mask == batch_mask  # Both implementations must agree on every number
+    print(f'verify_card_number():  {count / scalar_time:,.0f} numbers/sec')
+    print(f'verify_card_numbers(): {count / batch_time:,.0f} numbers/sec ({scalar_time / batch_time:.1f}x)')
+
+
+# Streams card numbers from the binary file object 'source' line by line and copies every line to
+# 'valid_output' or 'invalid_output' (binary file objects, or None to discard) depending on its Luhn check.
+# 'column' selects a field of a delimited (CSV) line instead of using the whole line (quoted fields may contain
+# the delimiter, but not line breaks), and 'header' copies the first line to both outputs without checking it.
+# Only one line is held in memory at a time. 'scheme' picks another validator from CHECKSUMS, so the same tool
+# can partition files of IBANs, ISBNs, IMEIs, ...
+# Returns the counters {'total': ..., 'valid': ..., 'invalid': ...}; blank lines are skipped and not counted
+def partition_card_file(source, valid_output=None, invalid_output=None, column=None, delimiter=b',', header=False,
+                        scheme='luhn'):
+    validator = _checksum_validator(scheme)
+    counts = {'total': 0, 'valid': 0, 'invalid': 0}
+    lines = iter(source)
+
+    if header:
+        first_line = next(lines, b'')
+        for output in (valid_output, invalid_output):
+            if output is not None:
+                output.write(first_line)
+
+    for line in lines:
+        if not line.strip():
+            continue
+
+        field = line
+        if column is not None:
+            if b'"' in line:
+                # A quoted field may contain the delimiter ('"Doe, John",4111...'), so the csv module splits the
+                # line; lines without quotes take the faster bytes.split()
+                text_fields = next(csv.reader([line.decode('utf-8', 'replace')], delimiter=delimiter.decode()), [])
+                fields = [text_field.encode('utf-8') for text_field in text_fields]
+            else:
+                fields = line.split(delimiter)
+            field = fields[column] if column < len(fields) else b''
+        number = field.strip(b' \t\r\n"').translate(None, SEPARATORS)  # Also drop CSV quotes around the field
+
+        counts['total'] += 1
+        if validator(number):
+            counts['valid'] += 1
+            output = valid_output
+        else:
+            counts['invalid'] += 1
+            output = invalid_output
+        if output is not None:
+            output.write(line if line.endswith(b'\n') else line + b'\n')
+
+    return counts
+
+
+# Command-line entry point. Without arguments it reads card numbers from stdin; examples:
+#   python 2.LuhnAlgorithm.py --number 4111-1111-4555-1241
+#   python 2.LuhnAlgorithm.py cards.csv --column 2 --header --valid valid.csv --invalid invalid.csv
+def main(argv=None):
+    import argparse  # Only needed when the script is used from the command line
+    import sys
+
+    parser = argparse.ArgumentParser(description='Validate card numbers with the Luhn algorithm.')
+    parser.add_argument('input', nargs='?', default='-', help="file of card numbers, or '-' for stdin (default)")
+    parser.add_argument('--number', help='check a single card number and print VALID! or INVALID!')
+    parser.add_argument('--valid', help='file to write the lines with a valid card number to')
+    parser.add_argument('--invalid', help='file to write the lines with an invalid card number to')
+    parser.add_argument('--column', type=int, help='0-based field holding the card number in delimited lines')
+    parser.add_argument('--delimiter', default=',', help="field delimiter used with --column (default ',')")
+    parser.add_argument('--header', action='store_true', help='the first line is a header and is not checked')
+    parser.add_argument('--scheme', choices=sorted(CHECKSUMS), default='luhn',
+                        help='checksum used to validate the input file (default luhn)')
+    parser.add_argument('--benchmark', action='store_true', help='compare scalar and batch validation speed')
+    parser.add_argument('--generate', type=int, metavar='COUNT', help='print COUNT valid test card numbers')
+    parser.add_argument('--prefix', default='4', help='issuer prefix (IIN) of generated numbers (default 4)')
+    parser.add_argument('--length', type=int, default=16, help='length of generated numbers (default 16)')
+    args = parser.parse_args(argv)
+
+    if args.benchmark:
+        benchmark()
+        return
+
+    if args.generate is not None:
+        for card_number in generate_card_numbers(args.prefix, args.length, args.generate):
+            sys.stdout.write(card_number + '\n')
+        return
+
+    if args.number is not None:
+        # Create a translation table to remove hyphens and spaces from the card number
+        card_translation = str.maketrans({'-': '', ' ': ''})
+
+        # Translate the card number (removing any hyphens or spaces) using the translation table
+        translated_card_number = args.number.translate(card_translation)
+
+        # Verify the card number and print whether it is valid or invalid
+        if verify_card_number(translated_card_number):
+            print('VALID!')  # Print VALID! if the card passes the Luhn check
+        else:
+            print('INVALID!')  # Print INVALID! if the card fails the Luhn check
+        return
+
+    source = sys.stdin.buffer if args.input == '-' else open(args.input, 'rb')
+    valid_output = open(args.valid, 'wb') if args.valid else None
+    invalid_output = open(args.invalid, 'wb') if args.invalid else None
+    try:
+        counts = partition_card_file(source, valid_output, invalid_output,
+                                     args.column, args.delimiter.encode(), args.header, args.scheme)
+    finally:
+        # Close every file we opened ourselves, but never stdin
+        for opened_file in (valid_output, invalid_output, None if source is sys.stdin.buffer else source):
+            if opened_file is not None:
+                opened_file.close()
 
-    # Verify the card number and print whether it is valid or invalid
-    if verify_card_number(translated_card_number):
-        print('VALID!')  # Print VALID! if the card passes the Luhn check
-    else:
-        print('INVALID!')  # Print INVALID! if the card fails the Luhn check
+    print(f"Total: {counts['total']}  Valid: {counts['valid']}  Invalid: {counts['invalid']}")
 
 
-# Call the main function to run the verification process
-main()
\ No newline at end of file
+# Run the command-line tool only when the script is executed directly, not when it is imported
+if __name__ == '__main__':
+    main()
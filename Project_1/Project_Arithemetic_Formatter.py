@@ -1,72 +1,157 @@
 # Description: This script formats and arranges a series of arithmetic problems in a visually aligned way. 
 # It can optionally display the results of each problem as well.
+#
+# Project_Arithemetic_Formatter_Mine.py (the version that prints instead of returning) uses the same
+# formatting core below, so both always produce the same layout.
 
-def arithmetic_arranger(problems, show_answers=False):
-    # Check if there are more than 5 problems; if so, return an error message.
-    if len(problems) > 5:
-        return "Error: Too many problems."
-    
-    # Initialize lists to store each line of the final formatted output.
-    first_line = []   # Holds the first operands (numbers) in each problem.
-    second_line = []  # Holds the operator (+ or -) and the second operand.
-    dash_line = []    # Holds a line of dashes (separator) for each problem.
-    results_line = [] # Optionally holds the result of each arithmetic operation.
-
-    # Loop through each problem in the list
-    for problem in problems:
-        # Split the problem into the two operands and the operator.
-        # Example: "32 + 698" becomes ['32', '+', '698']
-        op1, operator, op2 = problem.split()
-
-        # Validate operands and operator:
-        # Ensure operands are not longer than 4 digits
-        if len(op1) > 4 or len(op2) > 4:
-            return "Error: Numbers cannot be more than four digits."
-        
-        # Ensure both operands are numeric (i.e., contain only digits)
-        if not op1.isdigit() or not op2.isdigit():
-            return "Error: Numbers must only contain digits."
-
-        # Ensure that the operator is either '+' or '-'
-        if operator not in ['+', '-']:
-            return "Error: Operator must be '+' or '-'."
-
-        # If the optional show_answers flag is True, calculate the result of the operation
-        if show_answers:
-            # Perform the appropriate arithmetic operation
-            if operator == '+':
-                result = str(int(op1) + int(op2))  # Addition
-            else:
-                result = str(int(op1) - int(op2))  # Subtraction
-
-        # Determine the width for formatting each problem based on the larger operand
-        total_width = max(len(op1), len(op2)) + 2  # Add 2 for the operator and space
-
-        # Format the first operand to be right-aligned with the determined width.
-        first_line.append(op1.rjust(total_width))
-        
-        # Format the second line with the operator and second operand.
-        second_line.append(f"{operator} {op2.rjust(total_width - 2)}")
-        
-        # Create a line of dashes ('-') that matches the width of the problem.
-        dash_line.append('-' * total_width)
-        
-        # If showing answers, format the result to be right-aligned with the total width.
-        if show_answers:
-            results_line.append(result.rjust(total_width))
-
-    # Join all parts of each problem into their respective lines using 4 spaces ('    ') between problems.
-    first_line_str = '    '.join(first_line)
-    second_line_str = '    '.join(second_line)
-    dash_line_str = '    '.join(dash_line)
-    
-    # If show_answers is True, join and return all lines including the result line.
+from operator import add, mul, sub  # Functions used to calculate the answers
+
+
+# Divides like a worksheet does: the integer quotient, followed by the remainder if there is one ("3 R1")
+def _divide(op1, op2):
+    quotient, remainder = divmod(op1, op2)
+    return f"{quotient} R{remainder}" if remainder else quotient
+
+
+# Operators allowed in a problem; the extended set (multiplication and division) is only used on request
+OPERATORS = {'+': add, '-': sub}
+EXTENDED_OPERATORS = {**OPERATORS, '*': mul, '/': _divide}
+
+
+# Splits a problem like "32 + 698" into its parts, once, and checks it. Errors are raised as ValueError with
+# the message arithmetic_arranger() returns. With 'extended' the operators '*' and '/' are allowed and the
+# operands may be longer than four digits
+def _parse_problem(problem, extended=False):
+    parts = problem.split()
+    if len(parts) != 3:
+        raise ValueError("Error: Problems must look like 'number operator number'.")
+    op1, operator, op2 = parts
+
+    # Ensure operands are not longer than 4 digits (unless extended)
+    if not extended and (len(op1) > 4 or len(op2) > 4):
+        raise ValueError("Error: Numbers cannot be more than four digits.")
+
+    # Ensure both operands only contain the digits 0-9
+    if not (op1.isascii() and op1.isdigit() and op2.isascii() and op2.isdigit()):
+        raise ValueError("Error: Numbers must only contain digits.")
+
+    # Ensure that the operator is one of the allowed ones
+    if operator not in (EXTENDED_OPERATORS if extended else OPERATORS):
+        if extended:
+            raise ValueError("Error: Operator must be '+', '-', '*' or '/'.")
+        raise ValueError("Error: Operator must be '+' or '-'.")
+    if operator == '/' and int(op2) == 0:
+        raise ValueError("Error: Division by zero.")
+
+    return op1, operator, op2
+
+
+# Formats one row of parsed problems: operands right-aligned, the operator at the left edge, a line of dashes
+# and optionally the answers, with 4 spaces between problems. The size of the output is known once the widths
+# are, so it is written straight into a preallocated buffer filled with spaces instead of joining many strings
+def _format_row(parsed_problems, show_answers):
+    line_count = 4 if show_answers else 3
+
+    answers = []
     if show_answers:
-        results_line_str = '    '.join(results_line)
-        return f"{first_line_str}\n{second_line_str}\n{dash_line_str}\n{results_line_str}"
-    # Otherwise, return just the arranged arithmetic problems without results.
+        answers = [str(EXTENDED_OPERATORS[operator](int(op1), int(op2))) for op1, operator, op2 in parsed_problems]
+
+    # Width of each problem: the larger operand plus 2 for the operator and space (wider if an answer needs it)
+    widths = [max(len(op1), len(op2)) + 2 for op1, _, op2 in parsed_problems]
+    for index, answer in enumerate(answers):
+        widths[index] = max(widths[index], len(answer))
+
+    if not widths:
+        return '\n' * (line_count - 1)  # No problems: just the empty lines
+
+    line_length = sum(widths) + 4 * (len(widths) - 1)
+    stride = line_length + 1  # Each line plus its newline character
+    buffer = bytearray(b' ') * (stride * line_count - 1)
+    for line in range(1, line_count):
+        buffer[line * stride - 1] = ord('\n')
+
+    column = 0
+    for index, ((op1, operator, op2), width) in enumerate(zip(parsed_problems, widths)):
+        end = column + width  # Right edge of this problem
+        buffer[end - len(op1):end] = op1.encode()  # First line: first operand
+        buffer[stride + column] = ord(operator)  # Second line: operator...
+        buffer[stride + end - len(op2):stride + end] = op2.encode()  # ...and second operand
+        buffer[2 * stride + column:2 * stride + end] = b'-' * width  # Third line: dashes
+        if show_answers:
+            answer = answers[index]
+            buffer[3 * stride + end - len(answer):3 * stride + end] = answer.encode()  # Fourth line: answer
+        column = end + 4  # 4 spaces between problems
+
+    return buffer.decode('ascii')
+
+
+def arithmetic_arranger(problems, show_answers=False, extended=False, print_output=False):
+    # Check if there are more than 5 problems; if so, the result is an error message.
+    if len(problems) > 5:
+        result = "Error: Too many problems."
     else:
-        return f"{first_line_str}\n{second_line_str}\n{dash_line_str}"
+        try:
+            # Parse and validate every problem once, then lay them all out as a single row
+            result = _format_row([_parse_problem(problem, extended) for problem in problems], show_answers)
+        except ValueError as error:
+            result = str(error)  # The error message is returned (or printed) instead of the arrangement
+
+    # Either print the arrangement (or error) or return it to the caller
+    if print_output:
+        print(result)
+        return None
+    return result
+
+
+# ---------------------------------------------------------------------------------------------------------
+# Worksheet generator: lays out any number of problems as printable pages, without the five-problem limit.
+# Problems are read lazily from any iterable and written to a file object row by row, so only one row of
+# problems is in memory at a time and the running time grows linearly with the number of problems.
+# ---------------------------------------------------------------------------------------------------------
+
+# Writes a worksheet for any iterable of problems to the file object 'output': 'columns' problems per row,
+# rows separated by a blank line and 'rows_per_page' rows per page, with a form feed ('\f') between pages so
+# that printers start a new sheet. Rows look exactly like arithmetic_arranger() output; since a worksheet is
+# streamed, an invalid problem raises ValueError instead of returning the message. Returns the problem count
+def write_worksheet(problems, output, columns=5, rows_per_page=10, show_answers=False, extended=False):
+    row = []  # Parsed problems of the row being filled
+    rows_on_page = 0
+    count = 0
+
+    def flush_row():
+        nonlocal rows_on_page
+        if rows_on_page == rows_per_page:
+            output.write('\f')  # Page break before the first row of a new page
+            rows_on_page = 0
+        elif rows_on_page:
+            output.write('\n')  # Blank line between two rows on the same page
+        output.write(_format_row(row, show_answers) + '\n')
+        rows_on_page += 1
+        row.clear()
+
+    for problem in problems:
+        row.append(_parse_problem(problem, extended))
+        count += 1
+        if len(row) == columns:
+            flush_row()
+    if row:
+        flush_row()  # Last, possibly incomplete, row
+    return count
+
+
+# Times write_worksheet() for growing numbers of problems to show that the cost per problem stays constant
+def benchmark(sizes=(10_000, 100_000, 1_000_000)):
+    import io  # Only needed for the benchmark
+    import random
+    import time
+
+    for size in sizes:
+        problems = [f"{random.randint(0, 9999)} {random.choice('+-')} {random.randint(0, 9999)}" for _ in range(size)]
+        start = time.perf_counter()
+        write_worksheet(problems, io.StringIO(), show_answers=True)
+        elapsed = time.perf_counter() - start
+        print(f'{size:>9,} problems: {elapsed:.3f} s ({elapsed / size * 1e6:.2f} µs per problem)')
 
 # Example usage: We arrange 4 arithmetic problems and display the answers.
-print(arithmetic_arranger(["32 + 698", "3801 - 2", "45 + 43", "123 + 49"], True))
\ No newline at end of file
+if __name__ == '__main__':
+    print(arithmetic_arranger(["32 + 698", "3801 - 2", "45 + 43", "123 + 49"], True))
@@ -0,0 +1,260 @@
+"""
+This script generalizes the bisection method of Square_Root.py into a small root-finding toolkit: instead of
+being hard-wired to mid**2 - target, every method accepts any function f(x) and finds an x where f(x) = 0.
+
+Methods:
+- **Bisection**: halves a bracket [low, high] with f(low) and f(high) of opposite signs. Slow but always works.
+- **Illinois (regula falsi)**: draws a straight line between the bracket ends and uses its zero as the next
+  point; when the same end is kept twice in a row its function value is halved, which avoids the slow
+  one-sided convergence of plain regula falsi.
+- **Secant**: like regula falsi but always uses the last two points, without keeping a bracket. Fast, but it
+  can diverge.
+- **Brent**: combines bisection, the secant method and inverse quadratic interpolation; as safe as bisection
+  and usually as fast as the secant method.
+
+Every method returns a RootResult that reports the root together with the number of iterations and function
+evaluations it took, so the fastest converging method can be chosen by measurement. solve_brackets() solves
+many independent brackets in lockstep with one call of a batch function per iteration.
+"""
+from math import copysign  # Gives a step the sign of the direction Brent's method has to move in
+
+EPSILON = 2.220446049250313e-16  # Distance from 1.0 to the next float (sys.float_info.epsilon)
+
+
+class RootResult:
+    # __slots__ is used to restrict the attributes allowed for this class, optimizing memory usage.
+    __slots__ = ('root', 'iterations', 'evaluations', 'converged', 'method')
+
+    def __init__(self, root, iterations, evaluations, converged, method):
+        self.root = root  # Best approximation of the root found
+        self.iterations = iterations  # Number of iterations performed
+        self.evaluations = evaluations  # Number of times the function was called
+        self.converged = converged  # False if max_iterations was reached first
+        self.method = method  # Name of the method that produced this result
+
+    def __repr__(self):
+        return (f'{self.__class__.__name__}(root={self.root}, iterations={self.iterations}, '
+                f'evaluations={self.evaluations}, converged={self.converged}, method={self.method!r})')
+
+
+# Checks that f(low) and f(high) have opposite signs (or one of them is already a root)
+def _check_bracket(low, high, f_low, f_high):
+    if f_low != 0 and f_high != 0 and (f_low > 0) == (f_high > 0):
+        raise ValueError(f'f({low}) and f({high}) must have opposite signs to bracket a root')
+
+
+def bisection(f, low, high, tolerance=1e-12, max_iterations=200):
+    # Same idea as square_root_bisection(): keep the half of the bracket in which f changes sign
+    f_low, f_high = f(low), f(high)
+    _check_bracket(low, high, f_low, f_high)
+    if f_low == 0:
+        return RootResult(low, 0, 2, True, 'bisection')
+    if f_high == 0:
+        return RootResult(high, 0, 2, True, 'bisection')
+
+    mid = (low + high) / 2
+    for iteration in range(1, max_iterations + 1):
+        mid = (low + high) / 2
+        f_mid = f(mid)
+        if f_mid == 0 or (high - low) / 2 <= tolerance:
+            return RootResult(mid, iteration, iteration + 2, True, 'bisection')
+        if (f_mid > 0) == (f_low > 0):
+            low, f_low = mid, f_mid  # The sign change is in the upper half
+        else:
+            high = mid  # The sign change is in the lower half
+    return RootResult(mid, max_iterations, max_iterations + 2, False, 'bisection')
+
+
+# Next point of the Illinois method: the zero of the straight line through (low, f_low) and (high, f_high)
+def _false_position(low, high, f_low, f_high):
+    return (low * f_high - high * f_low) / (f_high - f_low)
+
+
+def illinois(f, low, high, tolerance=1e-12, max_iterations=200):
+    f_low, f_high = f(low), f(high)
+    _check_bracket(low, high, f_low, f_high)
+    if f_low == 0:
+        return RootResult(low, 0, 2, True, 'illinois')
+    if f_high == 0:
+        return RootResult(high, 0, 2, True, 'illinois')
+
+    kept = 0  # -1 if the low end was kept in the last step, +1 if the high end was, 0 at the start
+    point = low
+    for iteration in range(1, max_iterations + 1):
+        previous = point
+        point = _false_position(low, high, f_low, f_high)
+        f_point = f(point)
+        if f_point == 0 or abs(point - previous) <= tolerance:
+            return RootResult(point, iteration, iteration + 2, True, 'illinois')
+        if (f_point > 0) == (f_low > 0):
+            low, f_low = point, f_point  # The high end is kept...
+            if kept == 1:
+                f_high /= 2  # ...for the second time in a row, so its weight is halved
+            kept = 1
+        else:
+            high, f_high = point, f_point  # The low end is kept...
+            if kept == -1:
+                f_low /= 2  # ...for the second time in a row, so its weight is halved
+            kept = -1
+    return RootResult(point, max_iterations, max_iterations + 2, False, 'illinois')
+
+
+def secant(f, x0, x1, tolerance=1e-12, max_iterations=200):
+    # x0 and x1 are two starting points; they do not need to bracket the root
+    f0, f1 = f(x0), f(x1)
+    evaluations = 2
+    for iteration in range(max_iterations):
+        # 'iteration' steps have been taken so far
+        if f1 == 0:
+            return RootResult(x1, iteration, evaluations, True, 'secant')
+        if f1 == f0:
+            return RootResult(x1, iteration, evaluations, False, 'secant')  # Horizontal secant line: no next point
+        x0, x1 = x1, x1 - f1 * (x1 - x0) / (f1 - f0)
+        f0, f1 = f1, f(x1)
+        evaluations += 1
+        if abs(x1 - x0) <= tolerance:
+            return RootResult(x1, iteration + 1, evaluations, True, 'secant')
+    return RootResult(x1, max_iterations, evaluations, False, 'secant')
+
+
+def brent(f, low, high, tolerance=1e-12, max_iterations=200):
+    # Brent's method as described in Numerical Recipes (zbrent): 'b' is the best approximation so far,
+    # 'c' is the other end of the bracket and 'a' is the previous value of 'b'
+    a, b = low, high
+    f_a, f_b = f(a), f(b)
+    _check_bracket(low, high, f_a, f_b)
+    c, f_c = b, f_b
+    d = e = b - a  # Last step and the step before it
+
+    for iteration in range(1, max_iterations + 1):
+        if (f_b > 0) == (f_c > 0) and f_b != 0:
+            c, f_c = a, f_a  # Make sure [b, c] brackets the root
+            d = e = b - a
+        if abs(f_c) < abs(f_b):
+            a, b, c = b, c, b  # Make b the end with the smaller function value
+            f_a, f_b, f_c = f_b, f_c, f_b
+
+        step_tolerance = 2 * EPSILON * abs(b) + tolerance / 2
+        middle = (c - b) / 2
+        if abs(middle) <= step_tolerance or f_b == 0:
+            return RootResult(b, iteration - 1, iteration + 1, True, 'brent')
+
+        if abs(e) >= step_tolerance and abs(f_a) > abs(f_b):
+            # Try interpolation: secant if only two distinct points are known, inverse quadratic otherwise
+            s = f_b / f_a
+            if a == c:
+                p = 2 * middle * s
+                q = 1 - s
+            else:
+                q = f_a / f_c
+                r = f_b / f_c
+                p = s * (2 * middle * q * (q - r) - (b - a) * (r - 1))
+                q = (q - 1) * (r - 1) * (s - 1)
+            if p > 0:
+                q = -q
+            p = abs(p)
+            # Accept the interpolation only if it stays inside the bracket and shrinks fast enough
+            if 2 * p < min(3 * middle * q - abs(step_tolerance * q), abs(e * q)):
+                e, d = d, p / q
+            else:
+                d = e = middle  # Fall back to bisection
+        else:
+            d = e = middle  # Bounds decreasing too slowly: bisection
+
+        a, f_a = b, f_b
+        b += d if abs(d) > step_tolerance else copysign(step_tolerance, middle)
+        f_b = f(b)
+    return RootResult(b, max_iterations, max_iterations + 2, False, 'brent')
+
+
+# Bracketing methods that can be used by solve_brackets() and compare_methods()
+BRACKETING_METHODS = {'bisection': bisection, 'illinois': illinois, 'brent': brent}
+
+
+# Runs every method on the same problem and returns their results sorted by the number of function
+# evaluations, so the cheapest method for a family of equations can be picked by measurement
+def compare_methods(f, low, high, tolerance=1e-12, max_iterations=200):
+    results = [method(f, low, high, tolerance, max_iterations) for method in BRACKETING_METHODS.values()]
+    results.append(secant(f, low, high, tolerance, max_iterations))
+    return sorted(results, key=lambda result: (not result.converged, result.evaluations))
+
+
+# Solves many independent equations at once. 'batch_function(indices, points)' must return the list of
+# f_i(x) values for the equations numbered 'indices' at the matching 'points', which lets one call evaluate
+# all of them together (for example one vectorized model evaluation per tick). 'brackets' is a sequence of
+# (low, high) pairs. All brackets are advanced in lockstep with 'bisection' or 'illinois'; brackets that have
+# converged drop out of later calls. Returns one RootResult per bracket, in order
+def solve_brackets(batch_function, brackets, method='illinois', tolerance=1e-12, max_iterations=200):
+    if method not in ('bisection', 'illinois'):
+        raise ValueError("solve_brackets() supports the 'bisection' and 'illinois' methods")
+
+    count = len(brackets)
+    everything = list(range(count))
+    lows = [low for low, _ in brackets]
+    highs = [high for _, high in brackets]
+    f_lows = list(batch_function(everything, lows))
+    f_highs = list(batch_function(everything, highs))
+    points = list(lows)
+    kept = [0] * count  # Illinois: which end was kept in the last step
+    results = [None] * count
+
+    active = []
+    for index in everything:
+        _check_bracket(lows[index], highs[index], f_lows[index], f_highs[index])
+        if f_lows[index] == 0 or f_highs[index] == 0:
+            root = lows[index] if f_lows[index] == 0 else highs[index]
+            results[index] = RootResult(root, 0, 2, True, method)
+        else:
+            active.append(index)
+
+    for iteration in range(1, max_iterations + 1):
+        if not active:
+            break
+        previous_points = [points[index] for index in active]
+        if method == 'bisection':
+            new_points = [(lows[index] + highs[index]) / 2 for index in active]
+        else:
+            new_points = [_false_position(lows[index], highs[index], f_lows[index], f_highs[index]) for index in active]
+        values = batch_function(active, new_points)
+
+        still_active = []
+        for index, previous, point, value in zip(active, previous_points, new_points, values):
+            points[index] = point
+            if method == 'bisection':
+                done = (highs[index] - lows[index]) / 2 <= tolerance
+            else:
+                done = abs(point - previous) <= tolerance
+            if value == 0 or done:
+                results[index] = RootResult(point, iteration, iteration + 2, True, method)
+                continue
+            still_active.append(index)
+
+            # Keep the half/part of the bracket in which f changes sign (halving the weight of an end that is
+            # kept twice in a row for Illinois)
+            if (value > 0) == (f_lows[index] > 0):
+                lows[index], f_lows[index] = point, value
+                if method == 'illinois' and kept[index] == 1:
+                    f_highs[index] /= 2
+                kept[index] = 1
+            else:
+                highs[index], f_highs[index] = point, value
+                if method == 'illinois' and kept[index] == -1:
+                    f_lows[index] /= 2
+                kept[index] = -1
+        active = still_active
+
+    for index in active:
+        results[index] = RootResult(points[index], max_iterations, max_iterations + 2, False, method)
+    return results
+
+
+# Example usage: compare the methods on two equations
+if __name__ == '__main__':
+    import math
+
+    for name, function, low, high in [('x**2 - 16', lambda x: x**2 - 16, 0, 16),
+                                      ('cos(x) - x', lambda x: math.cos(x) - x, 0, 1)]:
+        print(f'\n{name} = 0 on [{low}, {high}]')
+        for result in compare_methods(function, low, high):
+            print(f'  {result.method:<10} root={result.root:<20} iterations={result.iterations:<4} '
+                  f'evaluations={result.evaluations}')
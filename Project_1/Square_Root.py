@@ -2,8 +2,99 @@
 This script finds the square root of a given number using the Bisection Method, 
 a numerical technique for solving equations by repeatedly narrowing down the interval 
 where the solution lies.
+
+It also offers much faster alternatives for when many square roots are needed:
+- Newton-Raphson and Halley iterations, which roughly double (Newton) or triple (Halley) the number of correct
+  digits on every step, started from a guess read off the number's binary exponent
+- square_roots(), which takes a whole sequence of numbers and returns their roots as an array('d'); it runs
+  the same per-element iteration as the scalar functions, so it is a convenience rather than a faster path
+
+For exact results there are integer_square_root(), the exact floor of the square root of an integer of any
+size, and square_root_decimal(), which gives as many correct decimal places as requested.
+
+Every iterative function accepts a 'trace' object to measure convergence: ConvergenceTrace records every step
+of one call, ConvergenceHistogram aggregates iteration counts over many calls.
 """
-def square_root_bisection(square_target, tolerance=1e-7, max_iterations=100):
+from array import array  # Compact storage for the targets and roots processed by square_roots()
+from decimal import MAX_PREC, Context, Decimal  # Result type of square_root_decimal()
+from fractions import Fraction  # Converts any exact number (int, float, Decimal, '1.5') into a ratio of integers
+from collections import Counter  # Counts how many calls needed each number of iterations
+from math import frexp, isfinite, ldexp, nan  # Used to split a float into mantissa and exponent for the guess
+
+
+# ---------------------------------------------------------------------------------------------------------
+# Convergence instrumentation. A trace is any object with two methods:
+# - record(iteration, width, residual): called after every iteration with the current interval width (the
+#   size of the last step for Newton/Halley) and residual (root**2 - target for bisection, root**2 / target - 1
+#   for Newton/Halley, which are relative)
+# - finish(converged, iterations): called once when a square root is done
+# Passing trace=None (the default) costs nothing but a comparison per iteration.
+# ---------------------------------------------------------------------------------------------------------
+
+class ConvergenceTrace:
+    # Records every step of a single call, to see how the interval and the residual shrink
+    __slots__ = ('steps', 'converged', 'iterations')
+
+    def __init__(self):
+        self.steps = []  # (iteration, width, residual) tuples
+        self.converged = None  # True or False once the call has finished
+        self.iterations = 0
+
+    def record(self, iteration, width, residual):
+        self.steps.append((iteration, width, residual))
+
+    def finish(self, converged, iterations):
+        self.converged = converged
+        self.iterations = iterations
+
+
+class ConvergenceHistogram:
+    # Aggregates many calls (for example a whole batch, or all targets in one data range) into a histogram of
+    # the iterations they needed, which shows what max_iterations and tolerance actually cost
+    __slots__ = ('iteration_counts', 'calls', 'failures', 'total_iterations')
+
+    def __init__(self):
+        self.iteration_counts = Counter()  # Iterations needed -> number of converged calls
+        self.calls = 0
+        self.failures = 0  # Calls that reached max_iterations without converging
+        self.total_iterations = 0
+
+    def record(self, iteration, width, residual):
+        pass  # Only whole calls are aggregated
+
+    def finish(self, converged, iterations):
+        self.calls += 1
+        self.total_iterations += iterations
+        if converged:
+            self.iteration_counts[iterations] += 1
+        else:
+            self.failures += 1
+
+    def mean_iterations(self):
+        return self.total_iterations / self.calls if self.calls else 0.0
+
+    # Smallest number of iterations that was enough for the given fraction of the converged calls, a good
+    # value for max_iterations (e.g. percentile(0.999))
+    def percentile(self, fraction):
+        needed = fraction * sum(self.iteration_counts.values())
+        seen = 0
+        for iterations in sorted(self.iteration_counts):
+            seen += self.iteration_counts[iterations]
+            if seen >= needed:
+                return iterations
+        return 0
+
+    def __str__(self):
+        lines = [f'{self.calls} calls, {self.failures} failed, {self.mean_iterations():.2f} iterations on average']
+        largest = max(self.iteration_counts.values(), default=0)
+        for iterations in sorted(self.iteration_counts):
+            count = self.iteration_counts[iterations]
+            bar = '#' * max(1, round(40 * count / largest))
+            lines.append(f'{iterations:>4} iterations: {count:>8} {bar}')
+        return '\n'.join(lines)
+
+
+def square_root_bisection(square_target, tolerance=1e-7, max_iterations=100, quiet=False, trace=None):
     # The bisection method is a numerical technique used to find the root (or zero) of a function. 
     # In this case, we're using it to find the square root of a number. 
     # The idea is to repeatedly narrow down the interval [low, high] where the root lies by checking the midpoint.
@@ -12,6 +103,8 @@ def square_root_bisection(square_target, tolerance=1e-7, max_iterations=100):
     # square_target: The number for which we want to find the square root.
     # tolerance: How close the approximation of the square root needs to be (i.e., the margin of error we're allowing).
     # max_iterations: The maximum number of steps we will take before giving up if no accurate root is found.
+    # quiet: If True, nothing is printed; the result is only returned.
+    # trace: Optional ConvergenceTrace/ConvergenceHistogram (or similar object) that records every iteration.
 
     # Check for edge cases: square root of negative numbers is not defined in real numbers.
     if square_target < 0:
@@ -20,10 +113,16 @@ def square_root_bisection(square_target, tolerance=1e-7, max_iterations=100):
     # Special cases: if the target is 0 or 1, return the result immediately.
     if square_target == 1:
         root = 1
-        print(f'The square root of {square_target} is 1')
+        if not quiet:
+            print(f'The square root of {square_target} is 1')
+        if trace is not None:
+            trace.finish(True, 0)
     elif square_target == 0:
         root = 0
-        print(f'The square root of {square_target} is 0')
+        if not quiet:
+            print(f'The square root of {square_target} is 0')
+        if trace is not None:
+            trace.finish(True, 0)
 
     else:
         # Set initial bounds for bisection: 
@@ -35,9 +134,14 @@ def square_root_bisection(square_target, tolerance=1e-7, max_iterations=100):
         root = None
         
         # Loop through up to the maximum number of iterations to narrow down the interval [low, high].
-        for _ in range(max_iterations):
+        iteration = 0
+        for iteration in range(1, max_iterations + 1):
             mid = (low + high) / 2  # Find the midpoint of the current interval.
             square_mid = mid**2  # Calculate the square of the midpoint.
+
+            # Report the interval width and the residual of this iteration to the trace, if there is one.
+            if trace is not None:
+                trace.record(iteration, high - low, square_mid - square_target)
             
             # Check if the squared value is close enough to the target (within the tolerance).
             if abs(square_mid - square_target) < tolerance:
@@ -52,18 +156,216 @@ def square_root_bisection(square_target, tolerance=1e-7, max_iterations=100):
             else:
                 high = mid
 
+        if trace is not None:
+            trace.finish(root is not None, iteration)
+
         # If we reach the maximum number of iterations without finding a root within the tolerance, print a message.
         if root is None:
-            print(f"Failed to converge within {max_iterations} iterations.")
+            if not quiet:
+                print(f"Failed to converge within {max_iterations} iterations.")
     
         # If we found a root, print the result.
-        else:   
+        elif not quiet:
             print(f'The square root of {square_target} is approximately {root}')
     
     # Return the root value or None if no root was found within the maximum iterations.
     return root
 
+
+# Splits a positive finite number into its binary mantissa and exponent: target = m * 2**e with 0.5 <= m < 1,
+# so sqrt(target) = sqrt(m) * 2**(e/2). Making e even puts m in [0.5, 2); the iterations then only ever work on
+# m, which can neither overflow nor underflow, and the result is scaled back with ldexp(root, e // 2).
+# (1 + m) / 2 is a starting guess within 6% of sqrt(m), always from above
+def _split_exponent(square_target):
+    mantissa, exponent = frexp(square_target)
+    if exponent % 2:
+        mantissa *= 2
+        exponent -= 1
+    return mantissa, exponent // 2
+
+
+# One Newton-Raphson step for f(y) = y**2 - target: y - f(y) / f'(y) = (y + target / y) / 2
+def _newton_step(root, square_target):
+    return (root + square_target / root) / 2
+
+
+# One Halley step for f(y) = y**2 - target, which also uses f''(y): y * (y**2 + 3 * target) / (3 * y**2 + target)
+def _halley_step(root, square_target):
+    square = root * root
+    return root * (square + 3 * square_target) / (3 * square + square_target)
+
+
+ROOT_STEPS = {'newton': _newton_step, 'halley': _halley_step}
+
+
+# Shared driver of square_root_newton() and square_root_halley(): iterates 'step' from the initial guess until
+# two successive approximations differ by at most 'tolerance' relative to the root
+def _square_root_iteration(square_target, step, tolerance, max_iterations, quiet, trace):
+    if square_target < 0:
+        raise ValueError('Square root of negative number is not defined in real numbers')
+
+    # 0, infinity and NaN are their own square roots
+    if square_target == 0 or not isfinite(square_target):
+        root = square_target
+        if trace is not None:
+            trace.finish(True, 0)
+    else:
+        root = None
+        mantissa, half_exponent = _split_exponent(square_target)
+        approximation = (1 + mantissa) / 2
+        iteration = 0
+        for iteration in range(1, max_iterations + 1):
+            next_approximation = step(approximation, mantissa)
+            if trace is not None:
+                trace.record(iteration, ldexp(abs(next_approximation - approximation), half_exponent),
+                             next_approximation * next_approximation / mantissa - 1)
+            if abs(next_approximation - approximation) <= tolerance * next_approximation:
+                root = ldexp(next_approximation, half_exponent)
+                break
+            approximation = next_approximation
+        if trace is not None:
+            trace.finish(root is not None, iteration)
+
+    if not quiet:
+        if root is None:
+            print(f"Failed to converge within {max_iterations} iterations.")
+        else:
+            print(f'The square root of {square_target} is approximately {root}')
+    return root
+
+
+# Square root with Newton-Raphson iterations (usually 4-5 steps for full float precision)
+def square_root_newton(square_target, tolerance=1e-15, max_iterations=50, quiet=False, trace=None):
+    return _square_root_iteration(square_target, _newton_step, tolerance, max_iterations, quiet, trace)
+
+
+# Square root with Halley iterations (usually 3 steps for full float precision)
+def square_root_halley(square_target, tolerance=1e-15, max_iterations=50, quiet=False, trace=None):
+    return _square_root_iteration(square_target, _halley_step, tolerance, max_iterations, quiet, trace)
+
+
+# Computes the square roots of a whole sequence of numbers with the 'newton' or 'halley' method and returns
+# them as an array('d') in the same order. Each element is iterated to convergence with the same seed and step
+# as square_root_newton() / square_root_halley(), so it runs at about the speed of calling those in a loop; it
+# only saves the printing and the per-call checks. Elements that do not converge within 'max_iterations' steps
+# are NaN. A 'trace' (typically a ConvergenceHistogram) gets one finish() call per element; record() is not
+# called
+def square_roots(square_targets, method='newton', tolerance=1e-15, max_iterations=50, trace=None):
+    if method not in ROOT_STEPS:
+        raise ValueError(f"Unknown method '{method}', expected one of: {', '.join(ROOT_STEPS)}")
+    step = ROOT_STEPS[method]
+    roots = array('d', square_targets)
+    if any(target < 0 for target in roots):
+        raise ValueError('Square root of negative number is not defined in real numbers')
+
+    for index, target in enumerate(roots):
+        # 0, infinity and NaN are their own square roots; every other element is iterated on its mantissa
+        if target == 0 or not isfinite(target):
+            if trace is not None:
+                trace.finish(True, 0)
+            continue
+        mantissa, half_exponent = _split_exponent(target)
+        approximation = (1 + mantissa) / 2
+        for iteration in range(1, max_iterations + 1):
+            next_approximation = step(approximation, mantissa)
+            if abs(next_approximation - approximation) <= tolerance * next_approximation:
+                roots[index] = ldexp(next_approximation, half_exponent)
+                if trace is not None:
+                    trace.finish(True, iteration)
+                break
+            approximation = next_approximation
+        else:
+            roots[index] = nan  # Did not converge
+            if trace is not None:
+                trace.finish(False, max_iterations)
+    return roots
+
+
+# Exact floor of the square root of a non-negative integer of any size (the largest a with a*a <= n).
+# This is Newton's method on integers with precision doubling: the root of the top 2 bits of n gives 1 correct
+# bit, each step uses it to get twice as many correct bits from twice as many bits of n. The last step
+# dominates the cost, so the whole computation takes about as long as one full-size division, O(M(n))
+def integer_square_root(n):
+    if n < 0:
+        raise ValueError('Square root of negative number is not defined in real numbers')
+    if n == 0:
+        return 0
+
+    c = (n.bit_length() - 1) // 2  # The root has c + 1 bits
+    a = 1  # Root of the top bits of n processed so far
+    d = 0  # Number of bits of the root determined so far, minus one
+    for s in reversed(range(c.bit_length())):
+        e = d
+        d = c >> s  # Double the number of bits determined
+        a = (a << d - e - 1) + (n >> 2 * c - e - d + 1) // a  # One Newton step on the next chunk of n
+    return a - (a * a > n)  # The last step can be one too large
+
+
+# Plain Newton's method on integers, starting from a power of two above the root. Every step costs a
+# full-size division, so it is O(M(n) log n); kept to show what precision doubling saves in benchmark_exact()
+def _integer_square_root_newton(n):
+    if n == 0:
+        return 0
+    root = 1 << (n.bit_length() + 1) // 2  # Always >= sqrt(n)
+    while True:
+        next_root = (root + n // root) // 2
+        if next_root >= root:
+            return root
+        root = next_root
+
+
+# Square root of any exact number (int, float, Decimal, Fraction or a string like '2.5') with 'digits' correct
+# decimal places, truncated, as a Decimal. The number is scaled by 10**(2 * digits) and its exact integer
+# square root is taken, so the result never depends on float precision or on a tolerance
+def square_root_decimal(square_target, digits=50):
+    target = Fraction(square_target)
+    if target < 0:
+        raise ValueError('Square root of negative number is not defined in real numbers')
+    scaled = target.numerator * 10 ** (2 * digits) // target.denominator
+    # Shift the decimal point back; the unlimited-precision context keeps every digit instead of rounding to 28
+    return Decimal(integer_square_root(scaled)).scaleb(-digits, context=Context(prec=MAX_PREC))
+
+
+# Compares how the exact integer square roots scale with the number of digits
+def benchmark_exact(digit_counts=(1_000, 10_000, 50_000, 100_000)):
+    import math  # Only needed for the benchmark
+    import random
+    import time
+
+    print(f"{'digits':>8} {'integer_square_root':>20} {'plain Newton':>14} {'math.isqrt':>12}")
+    for digit_count in digit_counts:
+        n = random.randrange(10 ** (digit_count - 1), 10 ** digit_count)
+        timings = []
+        for function in (integer_square_root, _integer_square_root_newton, math.isqrt):
+            start = time.perf_counter()
+            root = function(n)
+            timings.append(time.perf_counter() - start)
+            assert root * root <= n < (root + 1) ** 2
+        print(f'{digit_count:>8,} {timings[0]:>19.4f}s {timings[1]:>13.4f}s {timings[2]:>11.4f}s')
+
+
+# Compares how many square roots per second each method computes for 'count' random numbers
+def benchmark(count=100_000):
+    import random  # Only needed for the benchmark
+    import time
+
+    targets = [random.uniform(0, 1e6) for _ in range(count)]
+    methods = [
+        ('bisection', lambda: [square_root_bisection(target, quiet=True) for target in targets]),
+        ('newton', lambda: [square_root_newton(target, quiet=True) for target in targets]),
+        ('halley', lambda: [square_root_halley(target, quiet=True) for target in targets]),
+        ('square_roots(newton)', lambda: square_roots(targets, 'newton')),
+        ('square_roots(halley)', lambda: square_roots(targets, 'halley')),
+    ]
+    for name, run in methods:
+        start = time.perf_counter()
+        run()
+        elapsed = time.perf_counter() - start
+        print(f'{name:<22} {count / elapsed:>12,.0f} roots/sec')
+
+
 # Example usage:
-N = 16  # We're finding the square root of 16
-square_root_bisection(N)  # Call the function to compute the square root of N
+if __name__ == '__main__':
+    N = 16  # We're finding the square root of 16
+    square_root_bisection(N)  # Call the function to compute the square root of N
 
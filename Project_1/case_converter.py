@@ -1,65 +1,267 @@
-# Description: This script converts a given PascalCase or camelCase string into snake_case format using a for loop.
+# Description: This script converts identifiers between naming styles: snake_case, camelCase, PascalCase,
+# kebab-case and SCREAMING_SNAKE_CASE. Every identifier is first split into words by a compiled regular
+# expression that understands acronyms ('HTTPServer' -> 'HTTP', 'Server'), then the words are joined in the
+# requested style. Results are cached, so converting the same field name again costs a dictionary lookup.
 
-def convert_to_snake_case(pascal_or_camel_cased_string):
-    # Initialize an empty list to hold each character of the snake_cased string
-    snake_cased_char_list = []
+import re  # Regular expressions are used to split identifiers into words and to find strings in JSON
+from functools import lru_cache  # Caches the converted identifiers
 
-    # Loop through each character in the provided string
-    for char in pascal_or_camel_cased_string:
 
-        # If the character is uppercase (indicating the start of a new word)
-        if char.isupper():
-            # Convert the uppercase character to lowercase and prepend it with an underscore ('_')
-            converted_character = '_' + char.lower()
-            # Append the modified character to the snake_cased_char_list
-            snake_cased_char_list.append(converted_character)
-        else:
-            # If the character is already lowercase, append it as is
-            snake_cased_char_list.append(char)
+# The uppercase letters of Unicode ('A'-'Z', 'Ü', 'Σ', ...) as the ranges of a regular expression character
+# class, since re has no class for them. Cased letters all lie below U+20000, so the scan is short
+def _uppercase_class():
+    ranges = []
+    for code in range(0x20000):
+        character = chr(code)
+        if character.isupper() and character.isalnum():
+            if ranges and ranges[-1][1] == code - 1:
+                ranges[-1][1] = code
+            else:
+                ranges.append([code, code])
+    return ''.join(re.escape(chr(first)) + ('-' + re.escape(chr(last)) if last > first else '')
+                   for first, last in ranges)
+
+
+UPPERCASE = _uppercase_class()
+
+# One word of an identifier, tried in this order:
+# - an acronym: capitals not followed by a lowercase letter ('HTTP' in 'HTTPServer', 'ID' in 'userID')
+# - a normal word: an optional capital followed by lowercase letters ('Server', 'user', 'Über')
+# - a number on its own ('2' in 'version_2')
+# Digits right after a word stay with it ('utf8', 'HTTP2'). Anything else (_, -, spaces, ...) separates words.
+# Capitals are all the UPPERCASE letters, and a "lowercase letter" is any other letter, [^\W_\d<capitals>],
+# so letters without case (CJK, ...) continue a word like lowercase ones
+WORD_PATTERN = re.compile(r'[{0}]+(?![^\W_\d{0}])\d*|[{0}]?[^\W_\d{0}]+\d*|\d+'.format(UPPERCASE))
+
+# Leading and trailing characters that are neither part of a word nor a separator, like the '@' of '@type' or
+# the '$' of '$ref'. They are kept as they are, so '@id' and 'id' stay different keys
+AFFIX_PATTERN = re.compile(r'([^\w\s-]*)(.*?)([^\w\s-]*)', re.DOTALL)
+
+# Size of the caches: enough for the field names of a large code base
+CACHE_SIZE = 65536
+
+
+# Splits an identifier in any style into its words, keeping their original capitalization
+@lru_cache(maxsize=CACHE_SIZE)
+def split_words(identifier):
+    return tuple(WORD_PATTERN.findall(identifier))
+
+
+# Splits an identifier into its prefix, its words and its suffix: '@typeName' -> ('@', ('type', 'Name'), '')
+@lru_cache(maxsize=CACHE_SIZE)
+def _split_identifier(identifier):
+    prefix, body, suffix = AFFIX_PATTERN.fullmatch(identifier).groups()
+    return prefix, split_words(body), suffix
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def convert_to_snake_case(identifier):
+    # 'aLongAndComplexString' -> 'a_long_and_complex_string', 'HTTPServer' -> 'http_server'
+    prefix, words, suffix = _split_identifier(identifier)
+    return prefix + '_'.join(word.lower() for word in words) + suffix
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def convert_to_screaming_snake_case(identifier):
+    # 'maxRetryCount' -> 'MAX_RETRY_COUNT'
+    prefix, words, suffix = _split_identifier(identifier)
+    return prefix + '_'.join(word.upper() for word in words) + suffix
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def convert_to_kebab_case(identifier):
+    # 'IAmAPascalCasedString' -> 'i-am-a-pascal-cased-string'
+    prefix, words, suffix = _split_identifier(identifier)
+    return prefix + '-'.join(word.lower() for word in words) + suffix
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def convert_to_pascal_case(identifier):
+    # 'http_server' -> 'HttpServer' (acronyms are capitalized like any other word)
+    prefix, words, suffix = _split_identifier(identifier)
+    return prefix + ''.join(word.capitalize() for word in words) + suffix
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def convert_to_camel_case(identifier):
+    # 'HTTP_SERVER' -> 'httpServer'
+    prefix, words, suffix = _split_identifier(identifier)
+    pascal_cased_string = ''.join(word.capitalize() for word in words)
+    return prefix + pascal_cased_string[:1].lower() + pascal_cased_string[1:] + suffix
 
-    # After looping through all characters, join the list into a string
-    snake_cased_string = ''.join(snake_cased_char_list)
 
-    # If the first character was uppercase, we may have added a leading underscore.
-    # Remove any leading underscores by stripping them
-    clean_snake_cased_string = snake_cased_string.strip('_')
+# Style name -> conversion function, used by convert_case()
+CASE_CONVERTERS = {
+    'snake': convert_to_snake_case,
+    'camel': convert_to_camel_case,
+    'pascal': convert_to_pascal_case,
+    'kebab': convert_to_kebab_case,
+    'screaming': convert_to_screaming_snake_case,
+}
 
-    # Return the final snake_cased string
-    return clean_snake_cased_string
 
-def main():
-    # Test the function with a PascalCase string and print the result
-    print(convert_to_snake_case('aLongAndComplexString'))
+# Converts an identifier to the style named 'style' (one of the keys of CASE_CONVERTERS)
+def convert_case(identifier, style):
+    try:
+        converter = CASE_CONVERTERS[style]
+    except KeyError:
+        raise ValueError(f"Unknown case style '{style}', expected one of: {', '.join(CASE_CONVERTERS)}") from None
+    return converter(identifier)
 
-main()
 
+# ---------------------------------------------------------------------------------------------------------
+# Renaming the keys of JSON payloads, e.g. camelCase API payloads to snake_case.
+# Both functions below avoid recursion (deeply nested documents cannot hit the recursion limit) and convert
+# every distinct key only once per call.
+# ---------------------------------------------------------------------------------------------------------
 
-# Description: This script converts a given PascalCase or camelCase string into snake_case format using list comprehension for a more compact approach.
+# Returns a copy of a nested structure of dicts and lists (as produced by json.loads()) in which every string
+# dict key has been converted with 'converter'. An explicit stack of (original, copy) containers replaces
+# recursion; values other than dicts and lists are shared with the original
+def convert_keys(data, converter=convert_to_snake_case):
+    if not isinstance(data, (dict, list)):
+        return data
 
-def convert_to_snake_case(pascal_or_camel_cased_string):
-    # List comprehension that processes each character in the string:
-    # - If the character is uppercase, prepend it with an underscore ('_') and convert it to lowercase.
-    # - Otherwise, keep the character as it is (i.e., lowercase characters remain unchanged).
-    snake_cased_char_list = ['_' + char.lower() if char.isupper() else char for char in pascal_or_camel_cased_string]
+    converted_keys = {}  # Key -> converted key, for this call
+    result = {} if isinstance(data, dict) else []
+    stack = [(data, result)]
+    while stack:
+        original, copy = stack.pop()
+        items = original.items() if isinstance(original, dict) else enumerate(original)
+        for key, value in items:
+            if isinstance(value, (dict, list)):
+                value_copy = {} if isinstance(value, dict) else []
+                stack.append((value, value_copy))  # Filled in on a later pass of the while loop
+            else:
+                value_copy = value
 
-    # Join the list into a single string and strip any leading underscores (which could result from an uppercase first letter)
-    return ''.join(snake_cased_char_list).strip('_')
+            if isinstance(copy, list):
+                copy.append(value_copy)
+            else:
+                if isinstance(key, str):
+                    new_key = converted_keys.get(key)
+                    if new_key is None:
+                        new_key = converted_keys[key] = converter(key)
+                    key = new_key
+                copy[key] = value_copy
+    return result
 
-def main():
-    # Test the function with another PascalCase string and print the result
-    print(convert_to_snake_case('IAmAPascalCasedString'))
 
-main()
+# A JSON string (with escapes) or a run of anything that is not a string
+JSON_TOKEN = re.compile(r'"[^"\\]*(?:\\.[^"\\]*)*"|[^"]+', re.DOTALL)
+
+
+# Renames the keys of a JSON document that arrives as an iterable of text chunks of any size (for example
+# file.read() calls) and yields the rewritten document piece by piece, so documents far larger than memory can
+# be converted. Only object keys change: a key is a string token followed by ':'. Everything else, including
+# whitespace and string values, is copied unchanged. The document is not validated
+def convert_json_chunks(chunks, converter=convert_to_snake_case):
+    import json  # Decodes and encodes the keys; imported here so that importing this module stays cheap
+
+    converted_keys = {}  # Raw key token -> converted key token, for this document
+    buffer = ''  # Unprocessed text: at most an incomplete string token
+    pending = None  # Last string token, while it is still unknown whether a ':' follows (i.e. it is a key)
+    pending_space = ''  # Whitespace seen after the pending string
+
+    def key_token(token):
+        converted = converted_keys.get(token)
+        if converted is None:
+            converted = converted_keys[token] = json.dumps(converter(json.loads(token)), ensure_ascii=False)
+        return converted
+
+    for chunk in chunks:
+        buffer += chunk
+        pieces = []
+        position = 0
+        while True:
+            match = JSON_TOKEN.match(buffer, position)
+            if match is None:
+                break  # Nothing left, or a string that continues in the next chunk
+            token = match.group()
+            position = match.end()
+
+            if token[0] == '"':
+                if pending is not None:
+                    pieces.append(pending + pending_space)  # Two strings in a row: the first was not a key
+                pending, pending_space = token, ''
+            elif pending is None:
+                pieces.append(token)
+            elif token.isspace():
+                pending_space += token  # Still can't tell whether a ':' follows
+            else:
+                pieces.append(key_token(pending) if token.lstrip()[0] == ':' else pending)
+                pieces.append(pending_space + token)
+                pending, pending_space = None, ''
+
+        buffer = buffer[position:]
+        yield ''.join(pieces)
+
+    # End of the document: a pending string was not followed by ':' and a leftover buffer is an unterminated
+    # string; both are passed through as they are
+    yield (pending or '') + pending_space + buffer
+
+
+# Reads a JSON document from the text file object 'source' in chunks and writes it with converted keys to
+# 'destination', in constant memory
+def convert_json_file(source, destination, converter=convert_to_snake_case, chunk_size=1 << 20):
+    chunks = iter(lambda: source.read(chunk_size), '')  # Calls source.read() until it returns ''
+    for piece in convert_json_chunks(chunks, converter):
+        destination.write(piece)
+
+
+# Converts an iterable of lines (one identifier per line, e.g. an open file) lazily, one line at a time,
+# keeping each line's line ending
+def convert_lines(lines, style):
+    converter = CASE_CONVERTERS[style]
+    for line in lines:
+        identifier = line.rstrip('\r\n')
+        yield converter(identifier) + line[len(identifier):]
+
+
+# Command-line entry point; nothing runs when this module is imported. Examples:
+#   echo aLongAndComplexString | python case_converter.py snake
+#   python case_converter.py camel payload.json --json -o payload_camel.json
+def main(argv=None):
+    import argparse  # Only needed when the module is used from the command line
+    import sys
+
+    parser = argparse.ArgumentParser(description='Convert identifiers between naming styles.')
+    parser.add_argument('style', choices=list(CASE_CONVERTERS), help='style to convert to')
+    parser.add_argument('input', nargs='?', default='-', help="file to read, or '-' for stdin (default)")
+    parser.add_argument('-o', '--output', default='-', help="file to write, or '-' for stdout (default)")
+    parser.add_argument('--json', action='store_true', help='the input is a JSON document whose keys are converted')
+    args = parser.parse_intermixed_args(argv)  # Allows options between the positional arguments
+
+    source = sys.stdin if args.input == '-' else open(args.input, encoding='utf-8', newline='')
+    destination = sys.stdout if args.output == '-' else open(args.output, 'w', encoding='utf-8', newline='')
+    try:
+        if args.json:
+            convert_json_file(source, destination, CASE_CONVERTERS[args.style])
+        else:
+            destination.writelines(convert_lines(source, args.style))  # Streams line by line
+    finally:
+        # Only close the files we opened ourselves, never stdin/stdout
+        if source is not sys.stdin:
+            source.close()
+        if destination is not sys.stdout:
+            destination.close()
+
+
+if __name__ == '__main__':
+    main()
 
 """
 Explanation of Key Concepts:
-1. for Loop vs. List Comprehension:
-Script 1 uses a traditional for loop to iterate over each character in the string, applying a check for uppercase letters and building a list of characters.
-Script 2 achieves the same result using a more concise list comprehension, where the entire process of checking and converting characters is done in a single line.
-2. char.isupper():
-This function checks whether the character is an uppercase letter. It helps identify when to insert an underscore before the letter and convert it to lowercase for the snake_case format.
-3. String .join():
-This method is used to combine all the elements in the list snake_cased_char_list into a single string. It avoids the need for loops or concatenation inside the for loop.
-4. .strip('_'):
-This function removes any leading or trailing underscores from the string. In both scripts, this is used to handle cases where the first character of the original string was uppercase, which would have resulted in an extra underscore at the beginning of the result.
-"""
\ No newline at end of file
+1. Regular expression tokenizer:
+WORD_PATTERN describes what a single word looks like, and findall() returns all of them in one pass over the
+string. Because the pattern is compiled once at import time, splitting an identifier costs no more than a
+single regular-expression scan. The negative lookahead after the capitals of an acronym makes them stop before the
+capital that starts the next normal word, which is how 'HTTPServer' becomes 'HTTP' + 'Server' instead of 'H_T_T_P_Server'.
+2. Joining words:
+Every style is only a different way of joining the same words: with '_' or '-', lowercased or uppercased, or
+capitalized without a separator. str.join() builds the result in one step instead of appending characters.
+3. functools.lru_cache:
+Code generators convert the same field names over and over. lru_cache remembers the result for the most
+recently used CACHE_SIZE identifiers, so a repeated conversion is a dictionary lookup instead of a new regex
+scan.
+"""
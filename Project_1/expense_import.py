@@ -0,0 +1,266 @@
+# This script imports expenses in bulk from bank exports into the Expense Tracker (expense_tracker.py), instead
+# of typing them one at a time in the menu.
+#
+# Two formats are read: CSV files with a header row, and OFX bank statements (the <STMTTRN> transactions of
+# Quicken/Money style exports). Both are read as a stream, so the whole file is never held in memory. Every
+# row is validated, and the valid ones are handed to the tracker in batches of (amount, category, timestamp)
+# records, using the storage's add_many() where it has one. At the end a report tells how many rows were
+# imported or rejected and how many rows per second that was.
+
+import csv  # Reads the CSV exports row by row
+import html  # Decodes the entities (&amp;, &lt;, ...) in the text of OFX tags
+import re  # Validates amounts and finds the tags of OFX files
+import time  # Measures the import speed and stamps rows that have no date
+from datetime import datetime, timedelta, timezone  # Converts the dates of the exports to timestamps
+from itertools import islice  # Cuts the stream of records into batches
+
+from expense_tracker import BinaryLogExpenseStore, ColumnarExpenses, SQLiteExpenseStore
+
+# An amount: an optional sign and currency symbol, digits with optional thousands separators, and optional
+# decimals ('12', '-4.50', '$1,234.56'). Values like 'abc', '1e5' or 'nan' are rejected
+AMOUNT_PATTERN = re.compile(r'\s*([-+]?)\s*[$€£]?\s*(\d{1,3}(?:,\d{3})+|\d+)(\.\d+)?\s*')
+
+# Number of records handed to the storage at once
+BATCH_SIZE = 10_000
+
+
+class ImportReport:
+    # __slots__ is used to restrict the attributes allowed for this class, optimizing memory usage.
+    __slots__ = ('imported', 'rejected', 'seconds', 'errors')
+
+    MAX_ERRORS = 20  # Only the first rejected rows are described, to keep the report short
+
+    def __init__(self):
+        self.imported = 0  # Rows added to the tracker
+        self.rejected = 0  # Rows skipped because they were not valid
+        self.seconds = 0.0  # Time the import took
+        self.errors = []  # (row number, message) for the first MAX_ERRORS rejected rows
+
+    def reject(self, row_number, message):
+        self.rejected += 1
+        if len(self.errors) < self.MAX_ERRORS:
+            self.errors.append((row_number, message))
+
+    @property
+    def rows_per_second(self):
+        return (self.imported + self.rejected) / self.seconds if self.seconds else 0.0
+
+    def __str__(self):
+        lines = [f'Imported {self.imported} rows, rejected {self.rejected}, in {self.seconds:.2f} s '
+                 f'({self.rows_per_second:,.0f} rows/s)']
+        lines.extend(f'  row {row_number}: {message}' for row_number, message in self.errors)
+        return '\n'.join(lines)
+
+
+# Converts the text of an amount to a float, or raises ValueError if it is not a valid amount. CSV amounts have
+# at most 'max_decimals' decimals (cents); None allows any number, as OFX amounts do ('-7.125')
+def parse_amount(text, max_decimals=2):
+    match = AMOUNT_PATTERN.fullmatch(text)
+    if match is None or (max_decimals is not None and match[3] and len(match[3]) - 1 > max_decimals):
+        raise ValueError(f'invalid amount {text!r}')
+    sign, whole, decimals = match.groups()
+    return float(sign + whole.replace(',', '') + (decimals or ''))
+
+
+# Converts an ISO date ('2024-03-31' or '2024-03-31T12:30:00') to a timestamp; dates without a time zone are UTC
+def parse_iso_date(text):
+    moment = datetime.fromisoformat(text.strip())
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return moment.timestamp()
+
+
+# An OFX date: YYYYMMDD, optionally HHMM[SS[.XXX]], optionally the time zone as [offset in hours:name]
+OFX_DATE_PATTERN = re.compile(r'(\d{8}(?:\d{4}(?:\d{2})?)?)(?:\.\d+)?(?:\[([-+]?\d+(?:\.\d+)?)(?::[^\]]*)?\])?')
+OFX_DATE_FORMATS = {8: '%Y%m%d', 12: '%Y%m%d%H%M', 14: '%Y%m%d%H%M%S'}
+
+
+# Converts an OFX date ('20240331', '20240331123000' or '20240331123000.000[-5:EST]') to a timestamp. Times
+# are in the time zone given in brackets ('[-5:EST]' is 5 hours behind UTC), or in UTC if there is none
+def parse_ofx_date(text):
+    match = OFX_DATE_PATTERN.fullmatch(text.strip())
+    if match is None:
+        raise ValueError(f'invalid date {text!r}')
+    digits, offset_hours = match.groups()
+    zone = timezone.utc if offset_hours is None else timezone(timedelta(hours=float(offset_hours)))
+    return datetime.strptime(digits, OFX_DATE_FORMATS[len(digits)]).replace(tzinfo=zone).timestamp()
+
+
+# Reads the expenses of a CSV export, given as an iterable of lines (e.g. an open file), and yields one
+# (amount, category, timestamp) record per valid row. The columns are found by name in the header row; without
+# a date column every row gets the current time. Invalid rows are recorded in 'report' and skipped.
+# Expenses are positive amounts, and negative ones are rejected. With 'negative_debits' the export follows the
+# convention of bank statements (and of OFX files) instead: debits are negative and become positive expenses,
+# while credits (positive amounts) are skipped without being counted
+def read_csv_expenses(lines, report, amount_column='amount', category_column='category', date_column=None,
+                      delimiter=',', negative_debits=False):
+    rows = csv.reader(lines, delimiter=delimiter)
+    header = next(rows, None)
+    if header is None:
+        return
+    try:
+        amount_index = header.index(amount_column)
+        category_index = header.index(category_column)
+        date_index = header.index(date_column) if date_column else None
+    except ValueError as error:
+        raise ValueError(f'Missing column in the CSV header: {error}') from None
+
+    now = time.time()
+    for row_number, row in enumerate(rows, start=2):  # Row 1 is the header
+        if not row:
+            continue  # Blank line
+        try:
+            amount = parse_amount(row[amount_index])
+            if negative_debits:
+                if amount >= 0:
+                    continue  # A credit, not an expense
+                amount = -amount
+            elif amount < 0:
+                raise ValueError(f'negative amount {row[amount_index].strip()!r}')
+            category = row[category_index].strip()
+            if not category:
+                raise ValueError('empty category')
+            timestamp = now if date_index is None else parse_iso_date(row[date_index])
+        except IndexError:
+            report.reject(row_number, f'expected at least {len(header)} columns, got {len(row)}')
+            continue
+        except ValueError as error:
+            report.reject(row_number, str(error))
+            continue
+        yield amount, category, timestamp
+
+
+# An OFX tag and the text that follows it up to the next tag: OFX files are SGML, where closing tags of values
+# are optional ('<TRNAMT>-12.50' or '<TRNAMT>-12.50</TRNAMT>')
+OFX_TAG = re.compile(r'<(/?)([A-Z0-9.]+)>([^<]*)')
+
+
+# Reads the transactions of an OFX statement, given as an iterable of text chunks of any size (one line, or
+# file.read() calls), and yields one (amount, category, timestamp) record per debit. Debits have negative
+# amounts in OFX and are turned into positive expenses; credits (deposits, refunds) are not expenses and are
+# skipped without being counted. The category is the text of 'category_tag' (the payee NAME by default)
+def read_ofx_expenses(chunks, report, category_tag='NAME'):
+    transaction = None  # Tag -> text of the transaction being read
+    transaction_number = 0
+    for closing, tag, text in _ofx_tags(chunks):
+        if tag == 'STMTTRN':
+            if not closing:
+                transaction = {}
+            elif transaction is not None:
+                transaction_number += 1
+                record = _ofx_record(transaction, transaction_number, report, category_tag)
+                if record is not None:
+                    yield record
+                transaction = None
+        elif transaction is not None and not closing:
+            transaction[tag] = html.unescape(text.strip())  # 'Coffee &amp; Co' -> 'Coffee & Co'
+
+
+# Yields the (closing, tag, text) tuples of OFX_TAG for a document that arrives in chunks
+def _ofx_tags(chunks):
+    buffer = ''
+    for chunk in chunks:
+        buffer += chunk
+        end = buffer.rfind('<')  # The last tag may continue in the next chunk, so it waits
+        if end > 0:
+            yield from OFX_TAG.findall(buffer, 0, end)
+            buffer = buffer[end:]
+    yield from OFX_TAG.findall(buffer)
+
+
+# Turns the tags of one OFX transaction into an expense record, or None for credits and invalid transactions
+def _ofx_record(transaction, transaction_number, report, category_tag):
+    try:
+        amount = parse_amount(transaction.get('TRNAMT', ''), max_decimals=None)
+        timestamp = parse_ofx_date(transaction.get('DTPOSTED', ''))
+    except ValueError as error:
+        report.reject(transaction_number, str(error))
+        return None
+    if amount >= 0:
+        return None  # A credit, not an expense
+    category = transaction.get(category_tag) or transaction.get('TRNTYPE') or 'uncategorized'
+    return -amount, category, timestamp
+
+
+# Adds the records to 'expenses' (a list or a storage backend of expense_tracker) 'batch_size' at a time and
+# fills in 'report'. A list gets the same dictionaries as add_expense() adds, plus the timestamp
+def import_expenses(expenses, records, report, batch_size=BATCH_SIZE):
+    start = time.perf_counter()
+    records = iter(records)
+    while True:
+        batch = list(islice(records, batch_size))
+        if not batch:
+            break
+        if isinstance(expenses, list):
+            expenses.extend({'amount': amount, 'category': category, 'timestamp': timestamp}
+                            for amount, category, timestamp in batch)
+        elif hasattr(expenses, 'add_many'):
+            expenses.add_many(batch)  # One transaction or one write per batch
+        else:
+            for amount, category, timestamp in batch:
+                expenses.add(amount, category, timestamp)
+        report.imported += len(batch)
+    report.seconds = time.perf_counter() - start
+    return report
+
+
+# Imports a CSV or OFX file into 'expenses'; the format is chosen by the file extension unless given. The
+# csv_options are the keyword arguments of read_csv_expenses() and are ignored for OFX files
+def import_file(expenses, path, file_format=None, batch_size=BATCH_SIZE, **csv_options):
+    if file_format is None:
+        file_format = 'ofx' if path.lower().endswith(('.ofx', '.qfx')) else 'csv'
+    report = ImportReport()
+    # 'utf-8-sig' skips the byte order mark that Excel and many banks put at the start of their exports
+    with open(path, encoding='utf-8-sig', errors='replace', newline='') as source:
+        if file_format == 'ofx':
+            chunks = iter(lambda: source.read(1 << 16), '')  # Calls source.read() until it returns ''
+            records = read_ofx_expenses(chunks, report)
+        else:
+            records = read_csv_expenses(source, report, **csv_options)
+        return import_expenses(expenses, records, report, batch_size)
+
+
+# Command-line entry point. Examples:
+#   python expense_import.py statement.ofx --sqlite expenses.db
+#   python expense_import.py export.csv --date-column date --log expenses.log
+def main(argv=None):
+    import argparse  # Only needed when the module is used from the command line
+
+    parser = argparse.ArgumentParser(description='Import expenses from CSV or OFX files.')
+    parser.add_argument('files', nargs='+', help='CSV or OFX files to import')
+    parser.add_argument('--format', choices=['csv', 'ofx'], help='file format (default: from the file extension)')
+    parser.add_argument('--amount-column', default='amount', help="CSV column of the amounts (default: 'amount')")
+    parser.add_argument('--category-column', default='category',
+                        help="CSV column of the categories (default: 'category')")
+    parser.add_argument('--date-column', help='CSV column of the ISO dates (default: the time of the import)')
+    parser.add_argument('--delimiter', default=',', help="CSV field separator (default: ',')")
+    parser.add_argument('--negative-debits', action='store_true',
+                        help='CSV expenses are negative amounts and positive ones are skipped, as in OFX files '
+                             '(default: expenses are positive and negative amounts are rejected)')
+    parser.add_argument('--batch-size', type=int, default=BATCH_SIZE, help='records added at once')
+    storage = parser.add_mutually_exclusive_group()
+    storage.add_argument('--sqlite', metavar='FILE', help='import into an SQLite database')
+    storage.add_argument('--log', metavar='FILE', help='import into an append-only binary log')
+    args = parser.parse_intermixed_args(argv)  # Allows options between the file names
+
+    if args.sqlite:
+        expenses = SQLiteExpenseStore(args.sqlite)
+    elif args.log:
+        expenses = BinaryLogExpenseStore(args.log)
+    else:
+        expenses = ColumnarExpenses()  # Nothing is kept: only useful to check the files and measure the speed
+
+    csv_options = {'amount_column': args.amount_column, 'category_column': args.category_column,
+                   'date_column': args.date_column, 'delimiter': args.delimiter,
+                   'negative_debits': args.negative_debits}
+    try:
+        for path in args.files:
+            report = import_file(expenses, path, args.format, args.batch_size, **csv_options)
+            print(f'{path}: {report}')
+        print(f'Total expenses: {expenses.total():.2f} in {len(expenses)} rows')
+    finally:
+        expenses.close()
+
+
+if __name__ == '__main__':
+    main()
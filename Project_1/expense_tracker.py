@@ -1,9 +1,551 @@
 # This script is an Expense Tracker that allows users to add, list, calculate total, and filter expenses by category.
+#
+# The functions below work on a plain list of expenses, and also accept a storage object (see "Storage backends"
+# below). The program uses an ExpenseLedger, which keeps running totals per category in memory; for data that
+# has to survive the program or grow to millions of rows there are SQLiteExpenseStore and BinaryLogExpenseStore,
+# which keep indexes by category and by date, so totals and filters don't scan every row.
+# Bank exports (CSV or OFX) can be imported in bulk with expense_import.py.
 
-# Function to add an expense to the list
+import os  # Used to check the size of the binary log file
+import struct  # Packs expense records into bytes for the binary log
+import time  # Timestamps of the expenses stored in a backend
+from array import array  # Compact per-category lists of record positions in the binary log
+from bisect import bisect_left, bisect_right  # Binary search in the date index of the binary log
+from heapq import nlargest  # Picks the top categories without sorting all of them
+from itertools import accumulate, compress  # Prefix sums of amounts; selecting array entries without a Python loop
+
+
+# ---------------------------------------------------------------------------------------------------------
+# Storage backends. Each one has the same methods, which the functions below call when 'expenses' is not a
+# list: add(amount, category, timestamp=None), total(), by_category(category), between(start, end) and
+# iteration over all expenses. Expenses are returned as dictionaries like the ones in the list, plus the
+# 'timestamp' (seconds since the epoch) at which they were recorded.
+# ---------------------------------------------------------------------------------------------------------
+
+# Sorts a date index kept as two parallel arrays, the timestamps and the keys (record positions or ids) of
+# the matching expenses, in place. The indexes below append to the arrays as expenses are added and only sort
+# them, once, when a date query finds that expenses arrived out of time order
+def _sort_date_index(timestamps, keys):
+    pairs = sorted(zip(timestamps, keys))
+    timestamps[:] = array(timestamps.typecode, [timestamp for timestamp, _ in pairs])
+    keys[:] = array(keys.typecode, [key for _, key in pairs])
+
+
+class ExpenseLedger:
+    # Keeps the expenses in memory like the list does, but also maintains the running total and the sum and
+    # count of every category as expenses are added, edited or removed. Each of those changes updates the
+    # aggregates in O(1), and total(), category_total() and category_count() answer in constant time.
+    # Every expense gets an id (returned by add()) that is used to edit or remove it.
+    # A date index of (timestamp, id) pairs answers between() with a binary search; the ids of removed expenses
+    # stay in it and are skipped.
+
+    def __init__(self):
+        self.expenses = {}  # Id -> expense dictionary, in insertion order
+        self.timestamps = array('d')  # Date index: timestamps (in ascending order once sorted)...
+        self.timestamp_ids = array('Q')  # ...and the ids of the matching expenses
+        self._date_index_sorted = True  # False after an expense older than the newest one was added
+        self.category_expenses = {}  # Category -> {id: expense}, so a category is listed without a full scan
+        self.category_totals = {}  # Category -> sum of its amounts
+        self.category_counts = {}  # Category -> number of its expenses
+        self._total = 0.0
+        self._next_id = 0
+
+    # Adds an expense to the aggregates (used by add() and edit())
+    def _count(self, expense_id, expense):
+        category = expense['category']
+        self._total += expense['amount']
+        self.category_totals[category] = self.category_totals.get(category, 0) + expense['amount']
+        self.category_counts[category] = self.category_counts.get(category, 0) + 1
+        self.category_expenses.setdefault(category, {})[expense_id] = expense
+
+    # Removes an expense from the aggregates (used by remove() and edit())
+    def _uncount(self, expense_id, expense):
+        category = expense['category']
+        self._total -= expense['amount']
+        self.category_totals[category] -= expense['amount']
+        self.category_counts[category] -= 1
+        del self.category_expenses[category][expense_id]
+        if not self.category_counts[category]:
+            # Forget categories without expenses, so they don't show up with a total of 0
+            del self.category_totals[category], self.category_counts[category], self.category_expenses[category]
+
+    def add(self, amount, category, timestamp=None):
+        expense_id = self._next_id
+        self._next_id += 1
+        expense = {'amount': amount, 'category': category, 'timestamp': time.time() if timestamp is None else timestamp}
+        self.expenses[expense_id] = expense
+        self._count(expense_id, expense)
+        if self.timestamps and expense['timestamp'] < self.timestamps[-1]:
+            self._date_index_sorted = False
+        self.timestamps.append(expense['timestamp'])
+        self.timestamp_ids.append(expense_id)
+        return expense_id
+
+    def remove(self, expense_id):
+        self._uncount(expense_id, self.expenses.pop(expense_id))  # KeyError if there is no such expense
+
+    # Changes the amount and/or the category of an expense
+    def edit(self, expense_id, amount=None, category=None):
+        expense = self.expenses[expense_id]  # KeyError if there is no such expense
+        self._uncount(expense_id, expense)
+        if amount is not None:
+            expense['amount'] = amount
+        if category is not None:
+            expense['category'] = category
+        self._count(expense_id, expense)
+
+    def __iter__(self):
+        return iter(self.expenses.values())
+
+    def __len__(self):
+        return len(self.expenses)
+
+    def total(self):
+        return self._total
+
+    def category_total(self, category):
+        return self.category_totals.get(category, 0)
+
+    def category_count(self, category):
+        return self.category_counts.get(category, 0)
+
+    def by_category(self, category):
+        return iter(self.category_expenses.get(category, {}).values())
+
+    # Expenses recorded from 'start' (inclusive) to 'end' (exclusive), found by binary search in the date index
+    def between(self, start, end):
+        if not self._date_index_sorted:
+            _sort_date_index(self.timestamps, self.timestamp_ids)
+            self._date_index_sorted = True
+        first, last = bisect_left(self.timestamps, start), bisect_left(self.timestamps, end)
+        expenses = self.expenses
+        return (expenses[expense_id] for expense_id in self.timestamp_ids[first:last] if expense_id in expenses)
+
+    def close(self):
+        pass  # Nothing to close: the ledger only lives in memory
+
+
+class ColumnarExpenses:
+    # Stores the expenses column by column instead of one dictionary per expense: the amounts and timestamps
+    # in arrays of 8-byte floats and the categories as small integer codes in an array of 4-byte integers.
+    # Each category name is stored only once ('interned') in 'categories'. An expense then takes 20 bytes
+    # instead of the several hundred bytes of a dictionary, and totals are computed by C-level loops over the
+    # arrays. Expenses are still returned as dictionaries, created only when they are listed.
+    # While expenses are added in time order the timestamps column is sorted and between() searches it
+    # directly; otherwise the positions in time order are computed once and kept until the next add().
+    __slots__ = ('amounts', 'timestamps', 'category_codes', 'categories', 'codes_by_category', '_time_order')
+
+    def __init__(self):
+        self.amounts = array('d')
+        self.timestamps = array('d')
+        self.category_codes = array('I')
+        self.categories = []  # Code -> category name
+        self.codes_by_category = {}  # Category name -> code
+        self._time_order = None  # Positions sorted by timestamp, once an expense was added out of time order
+
+    # Returns the code of a category, giving new categories the next free code
+    def _code(self, category):
+        code = self.codes_by_category.get(category)
+        if code is None:
+            code = self.codes_by_category[category] = len(self.categories)
+            self.categories.append(category)
+        return code
+
+    def add(self, amount, category, timestamp=None):
+        if timestamp is None:
+            timestamp = time.time()
+        position = len(self.timestamps)
+        if self._time_order is None:
+            if self.timestamps and timestamp < self.timestamps[-1]:
+                self._time_order = array('Q')  # Out of time order: the positions are sorted by the next between()
+        elif len(self._time_order) == position and timestamp >= self.timestamps[self._time_order[-1]]:
+            self._time_order.append(position)  # The newest expense: the time order stays sorted
+        self.amounts.append(amount)
+        self.timestamps.append(timestamp)
+        self.category_codes.append(self._code(category))
+
+    # Appends many (amount, category, timestamp) tuples at once
+    def add_many(self, records):
+        for amount, category, timestamp in records:
+            self.add(amount, category, timestamp)
+
+    # Builds the dictionaries of the expenses at the given positions
+    def _expenses_at(self, positions):
+        for position in positions:
+            yield {'amount': self.amounts[position],
+                   'category': self.categories[self.category_codes[position]],
+                   'timestamp': self.timestamps[position]}
+
+    # Positions of the expenses of one category, found by comparing the codes in C (map, compress)
+    def _positions_of(self, category):
+        code = self.codes_by_category.get(category)
+        if code is None:
+            return iter(())
+        return compress(range(len(self.category_codes)), map(code.__eq__, self.category_codes))
+
+    def __iter__(self):
+        return self._expenses_at(range(len(self.amounts)))
+
+    def __len__(self):
+        return len(self.amounts)
+
+    def total(self):
+        return sum(self.amounts)
+
+    def category_total(self, category):
+        code = self.codes_by_category.get(category)
+        if code is None:
+            return 0
+        return sum(compress(self.amounts, map(code.__eq__, self.category_codes)))
+
+    def by_category(self, category):
+        return self._expenses_at(self._positions_of(category))
+
+    # Expenses recorded from 'start' (inclusive) to 'end' (exclusive), found by binary search
+    def between(self, start, end):
+        if self._time_order is None:
+            return self._expenses_at(range(bisect_left(self.timestamps, start), bisect_left(self.timestamps, end)))
+        if len(self._time_order) != len(self.timestamps):
+            self._time_order = array('Q', sorted(range(len(self.timestamps)), key=self.timestamps.__getitem__))
+        first = bisect_left(self._time_order, start, key=self.timestamps.__getitem__)
+        last = bisect_left(self._time_order, end, key=self.timestamps.__getitem__)
+        return self._expenses_at(self._time_order[first:last])
+
+    # Bytes used by the arrays (the category names are shared and not counted)
+    def memory_usage(self):
+        return sum(column.itemsize * len(column) for column in (self.amounts, self.timestamps, self.category_codes))
+
+    def close(self):
+        pass  # Nothing to close: the columns only live in memory
+
+
+# Compares the memory used by 'count' expenses as a list of dictionaries and as ColumnarExpenses
+def compare_memory(count=1_000_000):
+    import random  # Only needed for the comparison
+    import tracemalloc
+
+    categories = ['food', 'rent', 'travel', 'utilities', 'fun']
+    records = [(round(random.uniform(1, 500), 2), random.choice(categories), time.time()) for _ in range(count)]
+
+    tracemalloc.start()
+    expense_list = []
+    for amount, category, timestamp in records:
+        expense_list.append({'amount': amount, 'category': category, 'timestamp': timestamp})
+    list_bytes = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    tracemalloc.start()
+    columns = ColumnarExpenses()
+    columns.add_many(records)
+    columnar_bytes = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    print(f'List of dictionaries: {list_bytes / count:.0f} bytes per expense')
+    print(f'ColumnarExpenses:     {columnar_bytes / count:.0f} bytes per expense '
+          f'({list_bytes / columnar_bytes:.1f}x less)')
+
+
+class SQLiteExpenseStore:
+    # Stores the expenses in an SQLite database file. The category and timestamp columns are indexed, and
+    # triggers keep a small table of per-category totals up to date, so total() reads one row per category
+    # instead of summing every expense.
+
+    def __init__(self, path=':memory:'):
+        import sqlite3  # Only needed when this backend is used
+
+        self.connection = sqlite3.connect(path)
+        self.connection.executescript("""
+            CREATE TABLE IF NOT EXISTS expenses (
+                id INTEGER PRIMARY KEY,
+                amount REAL NOT NULL,
+                category TEXT NOT NULL,
+                timestamp REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS expenses_by_category ON expenses (category);
+            CREATE INDEX IF NOT EXISTS expenses_by_timestamp ON expenses (timestamp);
+
+            CREATE TABLE IF NOT EXISTS category_totals (
+                category TEXT PRIMARY KEY,
+                total REAL NOT NULL,
+                count INTEGER NOT NULL
+            );
+            CREATE TRIGGER IF NOT EXISTS expense_added AFTER INSERT ON expenses BEGIN
+                INSERT OR IGNORE INTO category_totals VALUES (NEW.category, 0, 0);
+                UPDATE category_totals SET total = total + NEW.amount, count = count + 1
+                    WHERE category = NEW.category;
+            END;
+            CREATE TRIGGER IF NOT EXISTS expense_removed AFTER DELETE ON expenses BEGIN
+                UPDATE category_totals SET total = total - OLD.amount, count = count - 1
+                    WHERE category = OLD.category;
+            END;
+        """)
+
+    def add(self, amount, category, timestamp=None):
+        self.add_many([(amount, category, time.time() if timestamp is None else timestamp)])
+
+    # Inserts many (amount, category, timestamp) tuples in a single transaction
+    def add_many(self, records):
+        with self.connection:  # Commits at the end, or rolls back if something fails
+            self.connection.executemany(
+                'INSERT INTO expenses (amount, category, timestamp) VALUES (?, ?, ?)', records)
+
+    def _select(self, where='', parameters=()):
+        cursor = self.connection.execute(
+            f'SELECT amount, category, timestamp FROM expenses {where} ORDER BY id', parameters)
+        for amount, category, timestamp in cursor:
+            yield {'amount': amount, 'category': category, 'timestamp': timestamp}
+
+    def __iter__(self):
+        return self._select()
+
+    def __len__(self):
+        return self.connection.execute('SELECT COALESCE(SUM(count), 0) FROM category_totals').fetchone()[0]
+
+    def total(self):
+        return self.connection.execute('SELECT COALESCE(SUM(total), 0) FROM category_totals').fetchone()[0]
+
+    def by_category(self, category):
+        return self._select('WHERE category = ?', (category,))
+
+    # Expenses recorded from 'start' (inclusive) to 'end' (exclusive), as timestamps
+    def between(self, start, end):
+        return self._select('WHERE timestamp >= ? AND timestamp < ?', (start, end))
+
+    def close(self):
+        self.connection.close()
+
+
+class BinaryLogExpenseStore:
+    # Stores the expenses in an append-only binary file: every expense is written once at the end and never
+    # changed. Each record is the amount and timestamp (two 8-byte floats) and the length of the category name
+    # (2 bytes), followed by the category name in UTF-8. When the file is opened it is read once to rebuild
+    # the indexes in memory: the total per category, the positions of the records of every category and a
+    # date index of (timestamp, position) pairs, sorted for binary search. A record cut off at the end of the
+    # file (an add() interrupted by a crash) is removed when the file is opened.
+
+    RECORD_HEADER = struct.Struct('<ddH')
+
+    def __init__(self, path):
+        self.log = open(path, 'a+b')  # Appending always writes at the end; reading uses seek()
+        self.category_totals = {}  # Category -> total amount
+        self.category_positions = {}  # Category -> array of record positions in the file
+        self.timestamps = array('d')  # Date index: timestamps (in ascending order once sorted)...
+        self.timestamp_positions = array('Q')  # ...and the positions of the matching records
+        self._date_index_sorted = True  # False after a record older than the newest one was indexed
+        self._total = 0.0
+
+        position = 0
+        size = os.path.getsize(path)
+        while position < size:
+            record = self._read_record(position, size)
+            if record is None:
+                self.log.truncate(position)  # Drop the incomplete record; new ones go after the last whole one
+                break
+            amount, category, timestamp, length = record
+            self._index(position, amount, category, timestamp)
+            position += length
+
+    # Reads the record at 'position'; returns None if the file (of 'size' bytes) ends in the middle of it
+    def _read_record(self, position, size=None):
+        self.log.seek(position)
+        header = self.log.read(self.RECORD_HEADER.size)
+        if len(header) < self.RECORD_HEADER.size:
+            return None
+        amount, timestamp, category_length = self.RECORD_HEADER.unpack(header)
+        length = self.RECORD_HEADER.size + category_length
+        if size is not None and position + length > size:
+            return None
+        category = self.log.read(category_length).decode('utf-8')
+        return amount, category, timestamp, length
+
+    def _index(self, position, amount, category, timestamp):
+        self._total += amount
+        self.category_totals[category] = self.category_totals.get(category, 0) + amount
+        self.category_positions.setdefault(category, array('Q')).append(position)
+
+        # Always an append: an expense older than the newest one only marks the index for sorting, which is then
+        # done once, by _sorted_date_index(), instead of an O(n) insert for every such expense
+        if self.timestamps and timestamp < self.timestamps[-1]:
+            self._date_index_sorted = False
+        self.timestamps.append(timestamp)
+        self.timestamp_positions.append(position)
+
+    # Sorts the date index if expenses were added out of time order since it was last sorted
+    def _sorted_date_index(self):
+        if not self._date_index_sorted:
+            _sort_date_index(self.timestamps, self.timestamp_positions)
+            self._date_index_sorted = True
+        return self.timestamps, self.timestamp_positions
+
+    def add(self, amount, category, timestamp=None):
+        if timestamp is None:
+            timestamp = time.time()
+        encoded_category = category.encode('utf-8')
+        self.log.seek(0, os.SEEK_END)
+        position = self.log.tell()
+        self.log.write(self.RECORD_HEADER.pack(amount, timestamp, len(encoded_category)) + encoded_category)
+        self.log.flush()
+        self._index(position, amount, category, timestamp)
+
+    # Appends many (amount, category, timestamp) tuples with a single write to the file
+    def add_many(self, records):
+        self.log.seek(0, os.SEEK_END)
+        position = self.log.tell()
+        packed = []
+        indexed = []  # Indexed only once the records are in the file
+        for amount, category, timestamp in records:
+            encoded_category = category.encode('utf-8')
+            packed.append(self.RECORD_HEADER.pack(amount, timestamp, len(encoded_category)) + encoded_category)
+            indexed.append((position, amount, category, timestamp))
+            position += len(packed[-1])
+        self.log.write(b''.join(packed))
+        self.log.flush()
+        for entry in indexed:
+            self._index(*entry)
+
+    def _expenses_at(self, positions):
+        for position in positions:
+            amount, category, timestamp, _ = self._read_record(position)
+            yield {'amount': amount, 'category': category, 'timestamp': timestamp}
+
+    def __iter__(self):
+        return self._expenses_at(sorted(self.timestamp_positions))  # File order is insertion order
+
+    def __len__(self):
+        return len(self.timestamps)
+
+    def total(self):
+        return self._total
+
+    def by_category(self, category):
+        return self._expenses_at(self.category_positions.get(category, ()))
+
+    # Expenses recorded from 'start' (inclusive) to 'end' (exclusive), found by binary search in the date index
+    def between(self, start, end):
+        timestamps, positions = self._sorted_date_index()
+        first, last = bisect_left(timestamps, start), bisect_left(timestamps, end)
+        return self._expenses_at(positions[first:last])
+
+    def close(self):
+        self.log.close()
+
+
+# ---------------------------------------------------------------------------------------------------------
+# Time-windowed queries: spending per category per week, top categories of a month, rolling averages.
+# ---------------------------------------------------------------------------------------------------------
+
+DAY = 24 * 60 * 60  # Lengths of the usual time buckets, in seconds
+WEEK = 7 * DAY
+
+
+class ExpenseTimeIndex:
+    # Keeps a copy of the amounts and categories of the expenses sorted by timestamp, together with the
+    # running (prefix) sums of the amounts. A time range is then found with two binary searches, so listing
+    # the k expenses of a range costs O(log n + k) instead of a scan of every expense, and the total of a
+    # range costs O(log n): the difference of two prefix sums.
+    # Build it from a list or a storage backend with ExpenseTimeIndex(expenses) and keep it up to date with add().
+
+    def __init__(self, expenses=()):
+        ordered = sorted(((expense['timestamp'], expense['amount'], expense['category']) for expense in expenses),
+                         key=lambda record: record[0])
+        self.timestamps = array('d', [timestamp for timestamp, _, _ in ordered])  # In ascending order
+        self.amounts = array('d', [amount for _, amount, _ in ordered])  # Amount of the expense at each position
+        self.categories = [category for _, _, category in ordered]  # Category of the expense at each position
+        self._prefix_sums = None  # prefix_sums[i] = sum of the first i amounts, computed by the first query
+
+    def add(self, amount, category, timestamp):
+        if not self.timestamps or timestamp >= self.timestamps[-1]:
+            # The usual case, expenses arriving in time order: append, and extend the prefix sums if they exist
+            self.timestamps.append(timestamp)
+            self.amounts.append(amount)
+            self.categories.append(category)
+            if self._prefix_sums is not None:
+                self._prefix_sums.append(self._prefix_sums[-1] + amount)
+            return
+        # An older expense is inserted in place, and the prefix sums after it are computed again when needed
+        index = bisect_right(self.timestamps, timestamp)
+        self.timestamps.insert(index, timestamp)
+        self.amounts.insert(index, amount)
+        self.categories.insert(index, category)
+        self._prefix_sums = None
+
+    def __len__(self):
+        return len(self.timestamps)
+
+    # Positions of the first expense at or after 'start' and of the first one at or after 'end'. None stands
+    # for the beginning or the end of the index
+    def _positions(self, start, end):
+        first = 0 if start is None else bisect_left(self.timestamps, start)
+        last = len(self.timestamps) if end is None else bisect_left(self.timestamps, end)
+        return first, max(first, last)
+
+    def _prefix(self):
+        if self._prefix_sums is None:
+            self._prefix_sums = array('d', accumulate(self.amounts, initial=0.0))
+        return self._prefix_sums
+
+    # Expenses recorded from 'start' (inclusive) to 'end' (exclusive), oldest first
+    def between(self, start=None, end=None):
+        first, last = self._positions(start, end)
+        for position in range(first, last):
+            yield {'amount': self.amounts[position], 'category': self.categories[position],
+                   'timestamp': self.timestamps[position]}
+
+    # Sum of the amounts from 'start' (inclusive) to 'end' (exclusive)
+    def total_between(self, start=None, end=None):
+        first, last = self._positions(start, end)
+        prefix_sums = self._prefix()
+        return prefix_sums[last] - prefix_sums[first]
+
+    # Sums of the amounts per category and time bucket: {(bucket start, category): total}. Buckets are
+    # 'bucket' seconds long and start at 'origin' + a multiple of 'bucket' (with the default origin, daily
+    # buckets start at midnight UTC; weekly ones on a Thursday, like the epoch, unless an origin is given)
+    def sums_by_bucket(self, bucket=WEEK, start=None, end=None, origin=0.0):
+        if bucket <= 0:
+            raise ValueError('The bucket length must be positive')
+        first, last = self._positions(start, end)
+        sums = {}
+        for position in range(first, last):
+            timestamp = self.timestamps[position]
+            key = (timestamp - (timestamp - origin) % bucket, self.categories[position])
+            sums[key] = sums.get(key, 0) + self.amounts[position]
+        return sums
+
+    # The 'count' categories with the highest spending from 'start' to 'end', as (category, total) pairs
+    def top_categories(self, count, start=None, end=None):
+        first, last = self._positions(start, end)
+        totals = {}
+        for position in range(first, last):
+            category = self.categories[position]
+            totals[category] = totals.get(category, 0) + self.amounts[position]
+        return nlargest(count, totals.items(), key=lambda item: item[1])
+
+    # Rolling average of the spending per bucket: for every bucket from 'start' to 'end', the total of the
+    # last 'window' buckets (itself included) divided by 'window'. Returns (bucket start, average) pairs.
+    # Every bucket costs two binary searches, whatever the number of expenses in the window
+    def rolling_average(self, window, bucket=DAY, start=None, end=None):
+        if window < 1 or bucket <= 0:
+            raise ValueError('The window must be at least 1 bucket and the bucket length must be positive')
+        if not self.timestamps:
+            return []
+        start = self.timestamps[0] if start is None else start
+        end = self.timestamps[-1] + bucket if end is None else end
+        averages = []
+        bucket_start = start
+        while bucket_start < end:
+            window_total = self.total_between(bucket_start - (window - 1) * bucket, bucket_start + bucket)
+            averages.append((bucket_start, window_total / window))
+            bucket_start += bucket
+        return averages
+
+
+# Function to add an expense to the list (or to a storage backend)
 def add_expense(expenses, amount, category):
-    # Appends a new expense as a dictionary containing the amount and category
-    expenses.append({'amount': amount, 'category': category})
+    if not isinstance(expenses, list):
+        expenses.add(amount, category)  # Storage backend: it keeps its own indexes up to date
+        return
+    # Appends a new expense as a dictionary containing the amount, the category and the time it was added
+    expenses.append({'amount': amount, 'category': category, 'timestamp': time.time()})
 
 # Function to print all the expenses
 def print_expenses(expenses):
@@ -13,6 +555,8 @@ def print_expenses(expenses):
 
 # Function to calculate the total expenses
 def total_expenses(expenses):
+    if not isinstance(expenses, list):
+        return expenses.total()  # Storage backends keep running totals, so nothing needs to be summed
     # `map` applies a function to each element in `expenses` and `lambda` is an anonymous function used here
     # The lambda function extracts the 'amount' field from each expense
     # `sum` adds all the amounts together to return the total expense amount
@@ -20,13 +564,54 @@ def total_expenses(expenses):
 
 # Function to filter expenses by category
 def filter_expenses_by_category(expenses, category):
+    if not isinstance(expenses, list):
+        return expenses.by_category(category)  # Storage backends look the category up in their index
     # `filter` applies the lambda function to each expense and keeps only the ones that match the category
     # The lambda function returns True for expenses that match the given category
     return filter(lambda expense: expense['category'] == category, expenses)
 
+# Function to filter expenses by the time they were recorded
+def filter_expenses_by_date(expenses, start, end):
+    # Returns the expenses recorded from 'start' (inclusive) to 'end' (exclusive), given as timestamps
+    if not isinstance(expenses, list):
+        return expenses.between(start, end)  # Storage backends and ExpenseTimeIndex search their date index
+    return filter(lambda expense: start <= expense['timestamp'] < end, expenses)
+
+# Function to print the spending per category of the last 'weeks' weeks (Monday to Sunday, UTC), most recent
+# week first. Only the expenses of those weeks are read, through the date index of the storage
+def print_weekly_spending(expenses, weeks=4):
+    monday = 4 * DAY  # 4 days after the epoch is a Monday
+    now = time.time()
+    start = now - (now - monday) % WEEK - (weeks - 1) * WEEK  # Start of the oldest week shown
+    sums = {}
+    for expense in filter_expenses_by_date(expenses, start, float('inf')):
+        timestamp = expense['timestamp']
+        key = (timestamp - (timestamp - monday) % WEEK, expense['category'])
+        sums[key] = sums.get(key, 0) + expense['amount']
+    for (week_start, category), total in sorted(sums.items(), key=lambda item: (-item[0][0], item[0][1])):
+        print(f'Week of {time.strftime("%Y-%m-%d", time.gmtime(week_start))}, Category: {category}, Total: {total}')
+
 # Main program that controls the expense tracker interface
-def main():
-    expenses = []  # Initialize an empty list to store expenses
+# Run it as 'python expense_tracker.py' to keep the expenses in memory, or with '--sqlite FILE' or '--log FILE'
+# to store them in a file so that they are still there the next time
+def main(argv=None):
+    import argparse  # Only needed to read the command-line options
+
+    parser = argparse.ArgumentParser(description='Track your expenses.')
+    storage = parser.add_mutually_exclusive_group()
+    storage.add_argument('--sqlite', metavar='FILE', help='store the expenses in an SQLite database')
+    storage.add_argument('--log', metavar='FILE', help='store the expenses in an append-only binary log')
+    storage.add_argument('--columnar', action='store_true', help='keep the expenses in memory in compact arrays')
+    args = parser.parse_args(argv)
+
+    if args.sqlite:
+        expenses = SQLiteExpenseStore(args.sqlite)
+    elif args.log:
+        expenses = BinaryLogExpenseStore(args.log)
+    elif args.columnar:
+        expenses = ColumnarExpenses()
+    else:
+        expenses = ExpenseLedger()  # Keeps the expenses in memory, with running totals
 
     # Infinite loop to keep the program running until the user chooses to exit
     while True:
@@ -36,7 +621,8 @@ def main():
         print('2. List all expenses')
         print('3. Show total expenses')
         print('4. Filter expenses by category')
-        print('5. Exit')
+        print('5. Show spending per category per week (last 4 weeks)')
+        print('6. Exit')
        
         # Get the user's choice of operation
         choice = input('Enter your choice: ')
@@ -72,12 +658,21 @@ def main():
             # Print the filtered expenses
             print_expenses(expenses_from_category)
     
-        # Option 5: Exit the program
+        # Option 5: Show spending per category per week
         elif choice == '5':
+            print('\nWeekly Spending (last 4 weeks):')
+            print_weekly_spending(expenses)
+
+        # Option 6: Exit the program
+        elif choice == '6':
             print('Exiting the program.')  # Exit message
             break  # Break the loop to end the program
 
-main()  # Start the program
+    # Close the database or log file, if one was used
+    expenses.close()
+
+if __name__ == '__main__':
+    main()  # Start the program
 
 """
 Breakdown of key concepts:
@@ -96,6 +691,6 @@ sum:
 sum: is a built-in function that adds up all the values in a list. Here, it adds the amounts of the expenses to calculate the total cost.
 Program Flow:
 
-The user can add expenses (option 1), list all expenses (option 2), see the total of all expenses (option 3), filter expenses by category (option 4), or exit the program (option 5).
+The user can add expenses (option 1), list all expenses (option 2), see the total of all expenses (option 3), filter expenses by category (option 4), see the spending per category per week (option 5), or exit the program (option 6).
 Each function is clearly separated based on its task, and it uses Python's functional programming tools like map and filter to make the code more concise and readable.
 """
\ No newline at end of file
@@ -1,6 +1,24 @@
+import mmap  # Maps word lists into memory instead of reading them
+import os  # Checks whether the saved index of a word list is still up to date
 import re  # The 're' module is used for regular expressions, which allow us to search for patterns in strings
 import secrets  # The 'secrets' module provides cryptographically secure random number generation, useful for generating passwords securely
 import string  # The 'string' module contains predefined constants like ascii_letters, digits, and punctuation
+from array import array  # Turns random bytes into 16-bit numbers for shuffling
+from functools import lru_cache  # Reuses the policies of generate_passwords()
+from math import comb, log2  # Count the passwords a policy allows, to estimate their entropy
+
+# Define the possible character sets for the password
+LOWERCASE = string.ascii_lowercase  # Lowercase letters (a-z)
+UPPERCASE = string.ascii_uppercase  # Uppercase letters (A-Z)
+DIGITS = string.digits              # Digits (0-9)
+SYMBOLS = string.punctuation        # Special characters like !@#$%&*
+
+# Combine all possible characters into a single string
+ALL_CHARACTERS = string.ascii_letters + DIGITS + SYMBOLS
+
+# Characters that are easily confused with each other when a password is read or typed
+AMBIGUOUS_CHARACTERS = 'Il1|O0o`\'"'
+
 
 def generate_password(length=16, nums=1, special_chars=1, uppercase=1, lowercase=1):
     """
@@ -10,27 +28,32 @@ def generate_password(length=16, nums=1, special_chars=1, uppercase=1, lowercase
     - special_chars: the minimum number of special characters required
     - uppercase: the minimum number of uppercase letters required
     - lowercase: the minimum number of lowercase letters required
-    """
 
-    # Define the possible character sets for the password
-    letters = string.ascii_letters  # Contains both lowercase and uppercase letters (a-z, A-Z)
-    digits = string.digits          # Contains digits (0-9)
-    symbols = string.punctuation    # Contains special characters like !@#$%&*
+    Instead of generating random passwords until one happens to meet the requirements, the password is built
+    so that it always does: the required characters are picked first, the rest of the password is filled with
+    characters from 'ALL_CHARACTERS', and the characters are then shuffled so the required ones can be anywhere.
+    See PasswordPolicy.generate(), which does the work.
+    """
+    return generate_passwords(1, length, nums, special_chars, uppercase, lowercase)[0]
 
-    # Combine all possible characters into a single string
-    all_characters = letters + digits + symbols
 
+def _generate_password_rejection(length=16, nums=1, special_chars=1, uppercase=1, lowercase=1):
+    """
+    The previous version of generate_password(), kept to compare the speed of both in benchmark(). It
+    generates random passwords until one meets all requirements, which can take very many tries (or never
+    end) for short passwords with high minimums.
+    """
     # Continue generating passwords until one meets all requirements
     while True:
         password = ''  # Start with an empty password string
         # Generate a random password of the specified length
         for _ in range(length):
-            password += secrets.choice(all_characters)  # Randomly pick characters from 'all_characters' and append to password
-        
+            password += secrets.choice(ALL_CHARACTERS)  # Randomly pick characters from 'ALL_CHARACTERS' and append to password
+
         # List of constraints: each tuple contains (minimum_required, regex pattern to check for that type of character)
         constraints = [
             (nums, r'\d'),  # At least 'nums' number of digits (0-9). Regex pattern \d matches any digit.
-            (special_chars, fr'[{symbols}]'),  # At least 'special_chars' number of special characters. The pattern checks for any character in 'symbols'.
+            (special_chars, fr'[{SYMBOLS}]'),  # At least 'special_chars' number of special characters. The pattern checks for any character in 'symbols'.
             (uppercase, r'[A-Z]'),  # At least 'uppercase' number of uppercase letters (A-Z). Regex [A-Z] matches uppercase letters.
             (lowercase, r'[a-z]')  # At least 'lowercase' number of lowercase letters (a-z). Regex [a-z] matches lowercase letters.
         ]
@@ -40,12 +63,446 @@ def generate_password(length=16, nums=1, special_chars=1, uppercase=1, lowercase
             constraint <= len(re.findall(pattern, password))  # For each constraint, check if the count of matching characters meets the minimum required
             for constraint, pattern in constraints  # Iterate over each constraint and its corresponding regex pattern
         ):
-            break  # If the password meets all requirements, exit the while loop
+            return password  # The password meets all requirements
+
+
+class _RandomPool:
+    """
+    Hands out secure random bytes from one large secrets.token_bytes() call, so that generating many passwords
+    does not ask the operating system for randomness once per character. If the pool runs out (which only
+    happens when many draws are rejected, see characters()) it is refilled with another call.
+    """
+    # __slots__ is used to restrict the attributes allowed for this class, optimizing memory usage.
+    __slots__ = ('data', 'position')
+
+    def __init__(self, size):
+        self.data = secrets.token_bytes(size)
+        self.position = 0
+
+    def take(self, size):
+        if self.position + size > len(self.data):
+            # Keep the unused bytes and add enough new ones
+            self.data = self.data[self.position:] + secrets.token_bytes(max(size, len(self.data) // 4))
+            self.position = 0
+        chunk = self.data[self.position:self.position + size]
+        self.position += size
+        return chunk
+
+    def characters(self, alphabet, count):
+        """
+        Returns 'count' characters drawn uniformly from 'alphabet', as bytes. Every random byte is mapped to
+        alphabet[byte % len(alphabet)] by bytes.translate(). Bytes at or above the largest multiple of
+        len(alphabet) are deleted, because otherwise the first characters of the alphabet would come up more
+        often than the others.
+        """
+        translation, rejected = _alphabet_table(alphabet)
+        result = b''
+        while len(result) < count:
+            missing = count - len(result)
+            result += self.take(_bytes_needed(alphabet, missing)).translate(translation, rejected)
+        return result[:count]
+
+    def below(self, limits):
+        """
+        Returns one uniform random number below each of the 'limits' (all at most 65536), using two random
+        bytes per number; a draw is repeated in the rare case that it falls above the last multiple of its limit.
+        """
+        numbers = array('H', self.take(2 * len(limits)))
+        results = []
+        for number, limit in zip(numbers, limits):
+            while number >= 65536 - 65536 % limit:
+                number = array('H', self.take(2))[0]
+            results.append(number % limit)
+        return results
+
+
+# Translation table and rejected bytes of characters(), for each alphabet
+_ALPHABET_TABLES = {}
+
+
+def _alphabet_table(alphabet):
+    if alphabet not in _ALPHABET_TABLES:
+        size = len(alphabet)
+        accepted = 256 - 256 % size  # Largest multiple of 'size' that is at most 256
+        translation = bytes(ord(alphabet[byte % size]) for byte in range(256))
+        _ALPHABET_TABLES[alphabet] = (translation, bytes(range(accepted, 256)))
+    return _ALPHABET_TABLES[alphabet]
+
+
+def _bytes_needed(alphabet, count):
+    # Random bytes needed on average to get 'count' characters, plus a small margin for the rejected bytes
+    accepted = 256 - 256 % len(alphabet)
+    return count * 256 // accepted + count // 16 + 16
+
+
+def _compose_passwords(requirements, length, count):
+    """
+    Generates 'count' passwords of 'length' characters. 'requirements' is a list of (alphabet, required) pairs:
+    every password gets 'required' characters from each 'alphabet', and the requirements must add up to
+    'length'. All the randomness normally comes from a single secrets.token_bytes() call. The characters of
+    every class are drawn for all the passwords at once by _RandomPool.characters(), and each password is then
+    shuffled with the Fisher-Yates algorithm, using random numbers from the same pool.
+    """
+    shuffle_limits = range(length, 1, -1)  # Fisher-Yates picks a position below length, length - 1, ..., 2
+
+    size = sum(_bytes_needed(alphabet, required * count) for alphabet, required in requirements)
+    pool = _RandomPool(size + 2 * len(shuffle_limits) * count + 64)
+
+    # The characters of every class for all the passwords, 'required' characters per password
+    drawn = [(pool.characters(alphabet, required * count), required) for alphabet, required in requirements]
+
+    passwords = []
+    for index in range(count):
+        characters = []
+        for class_characters, required in drawn:
+            characters += class_characters[index * required:(index + 1) * required]  # Adds the byte values
+        # Fisher-Yates shuffle: swap every position (from the end) with a random position before or at it
+        for position, swap in zip(range(length - 1, 0, -1), pool.below(shuffle_limits)):
+            characters[position], characters[swap] = characters[swap], characters[position]
+        passwords.append(bytes(characters).decode('ascii'))
+    return passwords
+
+
+# First code point used by PasswordPolicy to mark the class of a character (Unicode private use plane 15)
+_CLASS_CODES = 0xF0000
+
+
+class PasswordPolicy:
+    """
+    Describes which passwords are acceptable, and generates and validates passwords with it:
+    - length: the length of generated passwords, and the minimum length of valid ones
+    - classes: the character classes, as a dictionary of name -> (characters, minimum number required).
+      The classes must not share characters, and only ASCII characters are supported. By default the
+      digits, symbols, uppercase and lowercase letters, each with a minimum of 1
+    - excluded: characters that are never used or accepted, e.g. AMBIGUOUS_CHARACTERS
+    - max_repeats: the maximum number of times the same character may appear in a row (None for no limit)
+
+    Everything the checks need is prepared once when the policy is created, so is_valid() only has to run a
+    str.translate() call, one count() per class and one precompiled regular expression.
+    """
+    # __slots__ is used to restrict the attributes allowed for this class, optimizing memory usage.
+    __slots__ = ('length', 'classes', 'excluded', 'max_repeats', 'alphabet', '_class_table', '_repeat_pattern')
+
+    def __init__(self, length=16, classes=None, excluded='', max_repeats=None):
+        if classes is None:
+            classes = {'digits': (DIGITS, 1), 'symbols': (SYMBOLS, 1),
+                       'uppercase': (UPPERCASE, 1), 'lowercase': (LOWERCASE, 1)}
+        self.length = length
+        self.excluded = excluded
+        self.max_repeats = max_repeats
+        # Name -> (characters, minimum), without the excluded characters
+        self.classes = {name: (''.join(character for character in characters if character not in excluded), minimum)
+                        for name, (characters, minimum) in classes.items()}
+        self.alphabet = ''.join(characters for characters, _ in self.classes.values())
+
+        # Check that passwords can be generated at all
+        if not self.alphabet.isascii() or len(set(self.alphabet)) != len(self.alphabet):
+            raise ValueError('The character classes must be ASCII characters and must not share characters')
+        for name, (characters, minimum) in self.classes.items():
+            if minimum < 0:
+                raise ValueError(f"The minimum number of {name} cannot be negative")
+            if minimum and not characters:
+                raise ValueError(f"No {name} are left after excluding '{excluded}'")
+        if length > 0 and not self.alphabet:
+            raise ValueError(f"No characters are left after excluding '{excluded}'")
+        required = sum(minimum for _, minimum in self.classes.values())
+        if required > length:
+            raise ValueError(f'A password of {length} characters cannot hold {required} required characters')
+        if max_repeats is not None and (max_repeats < 1 or (len(self.alphabet) < 2 and length > max_repeats)):
+            raise ValueError(f'No password of {length} characters can repeat characters at most {max_repeats} times')
+
+        # Translation table that replaces every character by the code of its class (a private-use character),
+        # so that counting a class is a single str.count(). Characters that already are codes become the code
+        # of 'not in any class', like every other unknown character
+        codes = len(self.classes)
+        self._class_table = {code: chr(_CLASS_CODES + codes) for code in range(_CLASS_CODES, _CLASS_CODES + codes)}
+        for index, (characters, _) in enumerate(self.classes.values()):
+            self._class_table.update(dict.fromkeys(map(ord, characters), chr(_CLASS_CODES + index)))
+        # Matches a character followed by max_repeats more copies of itself
+        self._repeat_pattern = None if max_repeats is None else re.compile(fr'(.)\1{{{max_repeats}}}', re.DOTALL)
+
+    def __repr__(self):
+        return (f'{self.__class__.__name__}(length={self.length}, classes={self.classes!r}, '
+                f'excluded={self.excluded!r}, max_repeats={self.max_repeats})')
+
+    def is_valid(self, password):
+        """Returns True if 'password' meets every requirement of the policy."""
+        if len(password) < self.length:
+            return False
+        codes = password.translate(self._class_table)
+        found = 0  # Characters that belong to a class
+        for index, (_, minimum) in enumerate(self.classes.values()):
+            count = codes.count(chr(_CLASS_CODES + index))
+            if count < minimum:
+                return False
+            found += count
+        if found != len(password):
+            return False  # Excluded or unknown characters
+        return self._repeat_pattern is None or self._repeat_pattern.search(password) is None
+
+    def validate(self, password):
+        """Returns the list of requirements that 'password' does not meet (an empty list if it is valid)."""
+        problems = []
+        if len(password) < self.length:
+            problems.append(f'shorter than {self.length} characters')
+        codes = password.translate(self._class_table)
+        found = 0
+        for index, (name, (_, minimum)) in enumerate(self.classes.items()):
+            count = codes.count(chr(_CLASS_CODES + index))
+            if count < minimum:
+                problems.append(f'fewer than {minimum} {name}')
+            found += count
+        if found != len(password):
+            problems.append('contains characters that are not allowed')
+        if self._repeat_pattern is not None and self._repeat_pattern.search(password):
+            problems.append(f'repeats a character more than {self.max_repeats} times in a row')
+        return problems
+
+    def validate_many(self, passwords):
+        """Returns one True/False per password of the iterable 'passwords', lazily."""
+        return map(self.is_valid, passwords)
+
+    def generate(self, count=1, attempts=1000):
+        """
+        Generates a list of 'count' valid passwords: the minimum number of characters of every class, the rest
+        from all the classes together, shuffled (see _compose_passwords()). Passwords that repeat a character
+        too often are replaced by new ones, in at most 'attempts' rounds; ValueError is raised if that is not
+        enough, which means that (almost) no password meets both the minimums and max_repeats.
+        """
+        requirements = [(characters, minimum) for characters, minimum in self.classes.values() if minimum]
+        remaining = self.length - sum(minimum for _, minimum in requirements)
+        if remaining:
+            requirements.append((self.alphabet, remaining))
+        passwords = _compose_passwords(requirements, self.length, count)
+        if self._repeat_pattern is not None:
+            passwords = [password for password in passwords if not self._repeat_pattern.search(password)]
+            rounds = 0
+            while len(passwords) < count:
+                rounds += 1
+                if rounds > attempts:
+                    raise ValueError(f'Could not generate {count} passwords that repeat characters at most '
+                                     f'{self.max_repeats} times in a row in {attempts} attempts')
+                replacements = _compose_passwords(requirements, self.length, count - len(passwords))
+                passwords += [password for password in replacements if not self._repeat_pattern.search(password)]
+        return passwords
+
+    def entropy(self):
+        """
+        Returns the entropy in bits of a password chosen uniformly among all the passwords of 'length'
+        characters that have the minimum number of characters of every class: log2 of their number. The
+        passwords are counted class by class: ways[n] is the number of ways to fill n of the positions with
+        the classes seen so far. The max_repeats limit is not taken into account, so this is a slight
+        overestimate when it is set.
+        """
+        ways = [1] + [0] * self.length
+        for characters, minimum in self.classes.values():
+            new_ways = [0] * (self.length + 1)
+            for used, count in enumerate(ways):
+                if count:
+                    for taken in range(minimum, self.length - used + 1):
+                        # Choose which of the used + taken positions hold this class, then its characters
+                        new_ways[used + taken] += count * comb(used + taken, taken) * len(characters) ** taken
+            ways = new_ways
+        return log2(ways[self.length]) if ways[self.length] else 0.0
+
+    def password_entropy(self, password):
+        """
+        Estimates the strength of an existing password in bits, the usual way: its length times log2 of the
+        number of characters in the classes it uses (characters outside the classes count one each).
+        """
+        codes = password.translate(self._class_table)
+        pool = sum(len(characters) for index, (characters, _) in enumerate(self.classes.values())
+                   if chr(_CLASS_CODES + index) in codes)
+        pool += len({character for character, code in zip(password, codes) if character == code})
+        return len(password) * log2(pool) if pool > 1 else 0.0
+
+
+# The policy for the requirements of generate_password(), prepared once for every combination used
+@lru_cache(maxsize=64)
+def _requirements_policy(length, nums, special_chars, uppercase, lowercase):
+    return PasswordPolicy(length, {'digits': (DIGITS, nums), 'symbols': (SYMBOLS, special_chars),
+                                   'uppercase': (UPPERCASE, uppercase), 'lowercase': (LOWERCASE, lowercase)})
+
+
+def generate_passwords(count, length=16, nums=1, special_chars=1, uppercase=1, lowercase=1):
+    """
+    Generates 'count' passwords with the same requirements as generate_password() and returns them as a list.
+    """
+    return _requirements_policy(length, nums, special_chars, uppercase, lowercase).generate(count)
+
+
+class WordList:
+    """
+    A word list for passphrases (for example a diceware list such as the EFF large word list), mapped into
+    memory with mmap instead of being read. One word per line; when a line has several fields, like the dice
+    numbers of diceware lists ('11111\tabacus'), the word is the last one.
+
+    Only an index of where every line starts and ends is kept in memory, in two arrays. The index is saved
+    next to the list (in '<path>.index') and reused as long as the list does not change, so opening even a
+    very large list is fast. Because the list itself is only mapped, every process that opens it shares the
+    same pages of memory; a WordList sent to a worker process is reopened there from its path.
+    """
+    # __slots__ is used to restrict the attributes allowed for this class, optimizing memory usage.
+    __slots__ = ('path', 'starts', 'ends', '_file', '_map')
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, 'rb')
+        if not os.fstat(self._file.fileno()).st_size:
+            self._file.close()
+            raise ValueError(f'The word list {path} is empty')  # mmap cannot map an empty file
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        if not self._load_index():
+            self._build_index()
+
+    def _index_key(self):
+        # Size and modification time of the list: the saved index is only used if they have not changed
+        status = os.stat(self.path)
+        return array('Q', [status.st_size, status.st_mtime_ns])
+
+    def _load_index(self):
+        try:
+            with open(self.path + '.index', 'rb') as index_file:
+                data = array('Q', index_file.read())
+        except (OSError, ValueError):
+            return False
+        # The header is the key of the list and the number of words; an index that does not match them is for
+        # an older version of the list, or incomplete
+        if len(data) < 3 or data[:2] != self._index_key() or len(data) != 3 + 2 * data[2]:
+            return False
+        words = data[2]
+        self.starts, self.ends = data[3:3 + words], data[3 + words:]
+        return True
+
+    def _build_index(self):
+        self.starts, self.ends = array('Q'), array('Q')
+        for line in re.finditer(rb'[^\r\n]+', self._map):
+            if not line.group().isspace():
+                self.starts.append(line.start())
+                self.ends.append(line.end())
+        # The index is written to a temporary file which then replaces '<path>.index' in one step, so another
+        # process never reads a partly written index
+        temporary_path = f'{self.path}.index.{os.getpid()}.tmp'
+        try:
+            with open(temporary_path, 'wb') as index_file:
+                (self._index_key() + array('Q', [len(self.starts)]) + self.starts + self.ends).tofile(index_file)
+            os.replace(temporary_path, self.path + '.index')
+        except OSError:
+            # The folder is read-only (or the write failed): the index is built again next time
+            try:
+                os.remove(temporary_path)
+            except OSError:
+                pass
+
+    def __len__(self):
+        return len(self.starts)
+
+    def __getitem__(self, index):
+        return self._map[self.starts[index]:self.ends[index]].split()[-1].decode('utf-8')
+
+    def choose(self, count):
+        """Returns 'count' words, each chosen uniformly and independently with secrets.randbelow()."""
+        return [self[secrets.randbelow(len(self.starts))] for _ in range(count)]
+
+    def __reduce__(self):
+        return self.__class__, (self.path,)  # Worker processes map the file again instead of copying it
+
+    def close(self):
+        self._map.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def generate_passphrase(wordlist, words=6, separator='-', capitalize=True, digits=1, policy=None, attempts=1000):
+    """
+    Generates a passphrase such as 'Tidy-Reptile4-Crunchy-Unbiased-Ember-Lunar' from a WordList (or any
+    sequence of words):
+    - words: the number of words
+    - separator: the text between the words
+    - capitalize: whether the first letter of every word is made uppercase
+    - digits: the number of random digits added, each at the end of a random word
+    - policy: a PasswordPolicy the passphrase has to meet, e.g. PasswordPolicy(length=20). Passphrases that
+      don't meet it (too short, a word with a repeated letter, ...) are replaced by new ones, and ValueError is
+      raised if none of 'attempts' passphrases does, which means the options cannot meet the policy
+    """
+    if not len(wordlist):
+        raise ValueError('The word list is empty')
+    random = secrets.SystemRandom()
+    for _ in range(attempts):
+        if isinstance(wordlist, WordList):
+            chosen = wordlist.choose(words)
+        else:
+            chosen = [secrets.choice(wordlist) for _ in range(words)]
+        if capitalize:
+            chosen = [word[:1].upper() + word[1:] for word in chosen]
+        for _ in range(digits):
+            index = random.randrange(words)
+            chosen[index] += secrets.choice(DIGITS)
+        passphrase = separator.join(chosen)
+        if policy is None or policy.is_valid(passphrase):
+            return passphrase
+    raise ValueError(f'No passphrase met the policy in {attempts} attempts; '
+                     'add words, digits or a separator that the policy accepts')
+
+
+def passphrase_entropy(wordlist, words=6, digits=1):
+    """
+    Returns the entropy in bits of the passphrases of generate_passphrase() without a policy: every word is
+    one of len(wordlist), and every digit adds a choice of 10 digits and of 'words' places. Capitalization
+    and the separator are fixed, so they add nothing.
+    """
+    return words * log2(len(wordlist)) + digits * log2(10 * words)
+
+
+def benchmark(count=20_000):
+    """
+    Prints how many passwords per second each approach produces, for the default requirements and for short
+    passwords with high minimums, where the rejection approach has to throw away most of its passwords.
+    """
+    import time  # Only needed to measure the speed
+
+    cases = [('16 characters, default minimums', {'length': 16}),
+             ('8 characters, 3 digits and 3 symbols', {'length': 8, 'nums': 3, 'special_chars': 3})]
+    for description, requirements in cases:
+        print(description)
+        for name, function in [('rejection (previous)', lambda: _generate_password_rejection(**requirements)),
+                               ('generate_password', lambda: generate_password(**requirements))]:
+            runs = count // 10 if name.startswith('rejection') else count  # The old approach is much slower
+            start = time.perf_counter()
+            for _ in range(runs):
+                function()
+            print(f'  {name:<22} {runs / (time.perf_counter() - start):>12,.0f} passwords/s')
+        start = time.perf_counter()
+        generate_passwords(count, **requirements)
+        print(f'  {"generate_passwords":<22} {count / (time.perf_counter() - start):>12,.0f} passwords/s')
+
+    # Validation: the regular expressions of the previous version against a precompiled PasswordPolicy
+    policy = PasswordPolicy()
+    candidates = generate_passwords(count, length=16, nums=0, special_chars=0, uppercase=0, lowercase=0)
+    patterns = [r'\d', fr'[{SYMBOLS}]', r'[A-Z]', r'[a-z]']
+    print('Validation')
+    start = time.perf_counter()
+    for candidate in candidates:
+        all(1 <= len(re.findall(pattern, candidate)) for pattern in patterns)
+    print(f'  {"re.findall (previous)":<22} {count / (time.perf_counter() - start):>12,.0f} passwords/s')
+    start = time.perf_counter()
+    for _ in policy.validate_many(candidates):
+        pass
+    print(f'  {"PasswordPolicy":<22} {count / (time.perf_counter() - start):>12,.0f} passwords/s')
+
 
-    # Return the valid password
-    return password
-    
 if __name__ == '__main__':
     # If this script is being executed directly (not imported as a module), generate and print a password
     new_password = generate_password()  # Generate a password using the default parameters (length=16, at least 1 digit, 1 special char, 1 uppercase, 1 lowercase)
-    print('Generated password:', new_password)  # Output the generated password
\ No newline at end of file
+    print('Generated password:', new_password)  # Output the generated password
+
+    # 'python Password_generator.py words.txt' also prints a passphrase made of words from 'words.txt'
+    import sys
+    if len(sys.argv) > 1:
+        with WordList(sys.argv[1]) as wordlist:
+            print('Generated passphrase:', generate_passphrase(wordlist))